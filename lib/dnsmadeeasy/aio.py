@@ -0,0 +1,422 @@
+# coding: utf-8
+# libcloud-dnsmadeeasy
+# Copyright (C) 2014 Moses Palmér
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""An asynchronous variant of the DNSMadeEasy driver.
+
+This module requires *aiohttp*.
+"""
+
+import asyncio
+import json
+import requests
+import time
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from libcloud.common.types import LibcloudError
+from libcloud.dns.base import Zone
+from libcloud.dns.types import ZoneAlreadyExistsError, \
+    ZoneDoesNotExistError, RecordDoesNotExistError
+
+from .api import DNSMadeEasyAPI, Headers, is_rate_limited, rate_limit_wait
+from .base import DNSMadeEasyBase
+from .metrics import RequestEvent
+from .ratelimit import RequestScheduler
+
+
+class Response(object):
+    def __init__(self, method, url, status_code, reason, headers, content):
+        """A completely read response.
+
+        This class provides the parts of the :class:`requests.Response`
+        interface used by :meth:`DNSMadeEasyBase._raise_for_response` and
+        :meth:`DNSMadeEasyBase._decode`.
+
+        :param str method: The HTTP method of the request.
+
+        :param str url: The request URL.
+
+        :param int status_code: The response status.
+
+        :param str reason: The response reason phrase.
+
+        :param headers: The response headers.
+
+        :param bytes content: The response body.
+        """
+        self.request = requests.Request(method, url)
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            raise requests.HTTPError(
+                '%d Error: %s for url: %s' % (
+                    self.status_code, self.reason, self.url),
+                response = self)
+
+
+class AsyncDNSMadeEasyDNSDriver(DNSMadeEasyBase):
+    """
+    Asynchronous DNSMadeEasy DNS driver.
+
+    The methods ``list_zones``, ``list_records``, ``get_zone``,
+    ``get_record``, ``create_zone``, ``create_record``, ``delete_zone`` and
+    ``delete_record`` are coroutines; ``iterate_zones`` and
+    ``iterate_records`` are asynchronous generators.
+
+    This class shares the conversions and the error mapping with
+    :class:`~dnsmadeeasy.driver.DNSMadeEasyDNSDriver`, but is not a subclass
+    of it; the other methods of the synchronous driver are not available.
+    """
+    def __init__(self, api_key, api_secret, sandbox = False, index_ttl = 0,
+            concurrency = 10, pool_maxsize = 10, connect_timeout = None,
+            read_timeout = None, page_size = None, prefetch = False,
+            scheduler = None, entry_point = None, lazy_records = False,
+            rate_limit_timeout = None):
+        """Creates an asynchronous DNSMadeEasy driver.
+
+        The arguments not listed here have the same meaning as for
+        :class:`~dnsmadeeasy.driver.DNSMadeEasyDNSDriver`. Retries, caching
+        and revalidation are not supported, but with a scheduler, requests
+        rejected because of the request limit are resent just as by the
+        synchronous driver.
+
+        :param str api_key: The DNSMadeEasy API key.
+
+        :param str api_secret: The DNSMadeEasy secret.
+
+        :param bool sandbox: Whether to use the sandbox API.
+
+        :param int concurrency: The maximum number of requests in flight at
+            once.
+
+        :param int pool_maxsize: The maximum number of keep-alive connections
+            to keep open.
+
+        :param float connect_timeout: The timeout, in seconds, when
+            connecting to the API. ``None`` means wait forever.
+
+        :param float read_timeout: The timeout, in seconds, when waiting for a
+            response. ``None`` means wait forever.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                'AsyncDNSMadeEasyDNSDriver requires aiohttp')
+        if scheduler is True:
+            scheduler = RequestScheduler.shared(api_key)
+
+        # The API is only used to build URLs, and to hold the hooks and the
+        # scheduler
+        self._init_state(
+            DNSMadeEasyAPI(api_key, api_secret, sandbox,
+                scheduler = scheduler or None,
+                entry_point = entry_point,
+                rate_limit_timeout = rate_limit_timeout),
+            index_ttl,
+            lazy_records)
+        self._page_size = page_size
+        self._prefetch = prefetch
+        self._headers = Headers(api_key, api_secret)
+        self._verify = not sandbox
+        self._concurrency = concurrency
+        self._pool_maxsize = pool_maxsize
+        self._timeout = aiohttp.ClientTimeout(
+            sock_connect = connect_timeout,
+            sock_read = read_timeout)
+
+        # These must be created in the event loop
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Closes all connections to the API.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, method, endpoint, params = None, data = None):
+        """Performs a request and reads the response.
+
+        :param str method: The HTTP method.
+
+        :param hammock.Hammock endpoint: The endpoint; this is only used to
+            generate the URL.
+
+        :param dict params: The query parameters.
+
+        :param data: An object to send as JSON.
+
+        :return: the response
+        :rtype: Response
+        """
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector = aiohttp.TCPConnector(
+                    limit = self._pool_maxsize,
+                    ssl = None if self._verify else False),
+                timeout = self._timeout)
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+
+        if data is not None:
+            data = json.dumps(data)
+
+        scheduler = self._api._scheduler
+        hooks = self._api.hooks
+        url = endpoint._url()
+        path = urlparse(url).path
+        for hook in hooks:
+            hook.before_request(method, path)
+        response = None
+        deadline = None
+        start = time.perf_counter()
+        try:
+            while True:
+                async with self._semaphore:
+                    # Once the deadline for a request rejected because of the
+                    # request limit has passed, that response is returned
+                    if scheduler is not None and not await asyncio \
+                            .get_running_loop().run_in_executor(None,
+                                scheduler.acquire, rate_limit_wait(deadline)):
+                        break
+
+                    # The headers are signed with the current time, so they
+                    # must be calculated for every attempt
+                    headers = dict(self._headers.items())
+                    if data is not None:
+                        headers['Content-Type'] = 'application/json'
+                    async with self._session.request(method, url,
+                            params = params, data = data,
+                            headers = headers) as r:
+                        response = Response(method, url, r.status, r.reason,
+                            r.headers, await r.read())
+
+                if scheduler is None:
+                    break
+                scheduler.update(response.headers)
+
+                # A request rejected because of the request limit has not been
+                # applied, so it is safe to resend it once we have a token
+                if not is_rate_limited(response):
+                    break
+                if deadline is None \
+                        and self._api._rate_limit_timeout is not None:
+                    deadline = time.time() + self._api._rate_limit_timeout
+        finally:
+            if hooks:
+                event = RequestEvent.from_response(method, path, response,
+                    time.perf_counter() - start)
+                for hook in hooks:
+                    hook.after_request(event)
+
+        return response
+
+    async def _get_page(self, endpoint, page = None):
+        params = {}
+        if self._page_size:
+            params['rows'] = self._page_size
+            params['page'] = page or 0
+        elif page is not None:
+            params['page'] = page
+
+        r = await self._request('GET', endpoint, params = params)
+        self._raise_for_response(r)
+        return self._decode(r)
+
+    async def _iterate_pages(self, endpoint):
+        future = None
+        try:
+            response = await self._get_page(endpoint)
+            count = 1
+            while True:
+                next_page = response.get('page', count - 1) + 1
+                has_next = count < response.get('totalPages', 1)
+
+                if has_next and self._prefetch:
+                    future = asyncio.ensure_future(
+                        self._get_page(endpoint, next_page))
+                yield response['data']
+
+                if not has_next:
+                    break
+                response = await future \
+                    if self._prefetch \
+                    else await self._get_page(endpoint, next_page)
+                count += 1
+
+        finally:
+            if future is not None and not future.done():
+                future.cancel()
+
+    async def _list_record_items(self, zone):
+        items = []
+        async for page in self._iterate_pages(
+                self._api.dns.managed(zone.id).records):
+            items.extend(page)
+        return items
+
+    async def iterate_zones(self):
+        async for page in self._iterate_pages(self._api.dns.managed):
+            for item in page:
+                yield self._to_zone(item)
+
+    async def list_zones(self):
+        return [zone async for zone in self.iterate_zones()]
+
+    async def iterate_records(self, zone):
+        async for page in self._iterate_pages(
+                self._api.dns.managed(zone.id).records):
+            for record in self._to_records(page, zone):
+                yield record
+
+    async def list_records(self, zone):
+        items = await self._list_record_items(zone)
+        if self._index_ttl > 0:
+            self._index_records(zone, items)
+        return self._to_records(items, zone)
+
+    async def get_zone(self, zone_id):
+        r = await self._request('GET', self._api.dns.managed(zone_id))
+        try:
+            self._raise_for_response(r)
+            return self._to_zone(self._decode(r))
+
+        except requests.exceptions.HTTPError as e:
+            if r.status_code == 404:
+                raise ZoneDoesNotExistError(
+                    value = '', driver = self, zone_id = zone_id)
+            else:
+                raise
+
+    async def get_record(self, zone_id, record_id):
+        if isinstance(zone_id, Zone):
+            zone = zone_id
+        else:
+            index = self._get_index(str(zone_id))
+            if index is not None and index.is_fresh(self._index_ttl):
+                zone = index.zone
+            else:
+                zone = await self.get_zone(zone_id)
+
+        record_id = str(record_id)
+        index = self._get_index(zone.id)
+        if index is None \
+                or not index.is_fresh(self._index_ttl) \
+                or not record_id in index:
+            try:
+                index = self._index_records(zone,
+                    await self._list_record_items(zone))
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code == 404:
+                    raise ZoneDoesNotExistError(
+                        value = '', driver = self, zone_id = zone.id)
+                else:
+                    raise
+
+        item = index.get(record_id)
+        if item is None:
+            raise RecordDoesNotExistError(
+                value = '', driver = self, record_id = record_id)
+        return self._to_record(item, zone)
+
+    async def create_zone(self, domain, type = 'master', ttl = None,
+            extra = None):
+        r = await self._request('POST', self._api.dns.managed,
+            data = {
+                'names': [domain]})
+
+        try:
+            self._raise_for_response(r)
+            return self._to_zone(self._decode(r))
+
+        except self.ParsedError as e:
+            code, message = e.args
+            if code == 1 or code == 2:
+                raise ZoneAlreadyExistsError(value = domain, driver = self,
+                    zone_id = -1)
+            else:
+                raise
+
+    async def create_record(self, name, zone, type, data, extra = None):
+        record = self._to_record_item(name, type, data, extra)
+
+        r = await self._request('POST',
+            self._api.dns.managed(zone.id).records,
+            data = record)
+        try:
+            self._raise_for_response(r)
+            item = self._decode(r)
+
+        except LibcloudError as e:
+            self._raise_for_record_error(e, name)
+
+        index = self._get_index(zone.id)
+        if index is not None:
+            index.add(item)
+        return self._to_record(item, zone)
+
+    async def delete_zone(self, zone):
+        r = await self._request('DELETE', self._api.dns.managed(zone.id))
+
+        try:
+            self._raise_for_response(r)
+
+        except requests.exceptions.HTTPError as e:
+            if r.status_code == 404:
+                raise ZoneDoesNotExistError(
+                    value = zone, driver = self, zone_id = zone.id)
+            else:
+                raise
+
+        self._forget_zone(zone)
+
+    async def delete_record(self, record):
+        r = await self._request('DELETE',
+            self._api.dns.managed(record.zone.id).records(record.id))
+
+        try:
+            self._raise_for_response(r)
+        except:
+            if r.status_code == 404:
+                raise RecordDoesNotExistError(
+                    value = record, driver = self, record_id = record.id)
+            else:
+                raise
+
+        index = self._get_index(record.zone.id)
+        if index is not None:
+            index.remove(record.id)
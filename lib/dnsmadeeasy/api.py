@@ -14,20 +14,86 @@
 # You should have received a copy of the GNU General Public License along with
 # this program. If not, see <http://www.gnu.org/licenses/>.
 
-import collections
-import locale
 import hammock
 import hashlib
 import hmac
+import requests.adapters
+import requests.exceptions
+import threading
 import time
 
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 
-class Headers(collections.Mapping):
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+from .metrics import RequestEvent
+
+
+#: The abbreviated day names used in RFC 1123 dates, indexed by
+#: ``time.struct_time.tm_wday``
+DAY_NAMES = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+#: The abbreviated month names used in RFC 1123 dates, indexed by
+#: ``time.struct_time.tm_mon``
+MONTH_NAMES = (None, 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug',
+    'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def format_date(t):
+    """Formats a timestamp as an RFC 1123 date.
+
+    Unlike :func:`time.strftime`, this function does not depend on the current
+    locale.
+
+    :param int t: The timestamp, in seconds since the epoch.
+
+    :return: a date string like ``'Sun, 06 Nov 1994 08:49:37 GMT'``
+    :rtype: str
+    """
+    tm = time.gmtime(t)
+    return '%s, %02d %s %04d %02d:%02d:%02d GMT' % (
+        DAY_NAMES[tm.tm_wday], tm.tm_mday, MONTH_NAMES[tm.tm_mon], tm.tm_year,
+        tm.tm_hour, tm.tm_min, tm.tm_sec)
+
+
+def is_rate_limited(r):
+    """Returns whether a response is an error caused by the request limit.
+
+    :param requests.Response r: The server response.
+
+    :rtype: bool
+    """
+    return r.status_code == 400 \
+        and r.headers.get('x-dnsme-requestsRemaining', '') == '0'
+
+
+def rate_limit_wait(deadline):
+    """Returns the number of seconds left to wait for the request limit.
+
+    :param deadline: The time at which to stop waiting, as returned by
+        :func:`time.time`. ``None`` means wait forever.
+    :type deadline: float or None
+
+    :return: the timeout to pass to
+        :meth:`~dnsmadeeasy.ratelimit.RequestScheduler.acquire`
+    :rtype: float or None
+    """
+    return None if deadline is None else max(0.0, deadline - time.time())
+
+
+class Headers(Mapping):
     def __init__(self, api_key, api_secret, *args, **kwargs):
         """A mapping that returns calculated values when :func:`items` is
         called.
 
-        The values calculated are consistent each time :func:`items` is called.
+        The values calculated are consistent each time :func:`items` is called,
+        and are calculated at most once per second.
 
         :param str api_key: The API key.
 
@@ -37,16 +103,20 @@ class Headers(collections.Mapping):
         self._api_key = api_key
         self._secret = api_secret.encode()
 
+        # The signature for the current second, as the tuple (second,
+        # (timestamp, hash)); the tuple is replaced atomically
+        self._signature = (None, None)
+        self._lock = threading.Lock()
+
     def get_time(self):
         """Returns the timestamp for now.
 
         The timestamp is in the format required by DNSMadeEasy.
 
         :return: a timestamp
-        :rtype: time.time
+        :rtype: str
         """
-        locale.setlocale(locale.LC_TIME, "C")
-        return time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime())
+        return format_date(int(time.time()))
 
     def get_hash(self, t):
         """Returns the hash of a timestamp.
@@ -63,6 +133,27 @@ class Headers(collections.Mapping):
             t.encode(),
             hashlib.sha1).hexdigest()
 
+    def get_signature(self):
+        """Returns the timestamp for now and its hash.
+
+        Since the timestamp has a resolution of one second, the values are
+        calculated only once per second, and the same tuple is returned until
+        the second has passed. This method is thread safe.
+
+        :return: the tuple ``(timestamp, hash)``
+        :rtype: (str, str)
+        """
+        now = int(time.time())
+        second, signature = self._signature
+        if second != now:
+            with self._lock:
+                second, signature = self._signature
+                if second != now:
+                    t = format_date(now)
+                    signature = (t, self.get_hash(t))
+                    self._signature = (now, signature)
+        return signature
+
     def __getitem__(self, key):
         raise NotImplementedError()
 
@@ -75,13 +166,13 @@ class Headers(collections.Mapping):
     def items(self):
         """Returns the headers expected by DNSMadeEasy for authentication.
 
-        The values are calculated when this method is called, so the timestamps
-        and hashes are consistent.
+        The timestamp and its hash are those returned by
+        :meth:`get_signature`, so they are consistent, and are calculated only
+        once per second.
 
         :return: the headers expected by DNSMadeEasy
         """
-        t = self.get_time()
-        h = self.get_hash(t)
+        t, h = self.get_signature()
         return (
             ('x-dnsme-apiKey', self._api_key),
             ('x-dnsme-hmac', h),
@@ -92,18 +183,158 @@ class DNSMadeEasyAPI(hammock.Hammock):
     ENTRY_POINT_LIVE = 'https://api.dnsmadeeasy.com/V2.0'
     ENTRY_POINT_SANDBOX = 'https://sandbox.dnsmadeeasy.com'
 
-    def __init__(self, api_key, api_secret, sandbox = False):
+    def __init__(self, api_key, api_secret, sandbox = False,
+            pool_connections = 10, pool_maxsize = 10, max_retries = 0,
+            timeout = None, scheduler = None, entry_point = None,
+            retry = None, rate_limit_timeout = None):
         """Creates a DNSMadeEasyAPI instance.
 
         This object works just like a :class:`~hammock.Hammock` instance, but
         also sets the correct request headers based on ``api_key`` and
         ``api_secret``.
 
+        All requests made through this object and its children share one
+        session, and thus one pool of keep-alive connections.
+
         :param str api_key: The DNSMadeEasy API key.
 
         :param str api_secret: The DNSMadeEasy secret.
+
+        :param bool sandbox: Whether to use the sandbox API.
+
+        :param int pool_connections: The number of connection pools to cache.
+
+        :param int pool_maxsize: The maximum number of connections to keep
+            open to a single host.
+
+        :param int max_retries: The number of times to retry failed
+            connections. This only applies to failed DNS lookups, socket
+            connections and connection timeouts.
+
+        :param timeout: The default timeout for requests, either as a single
+            value or as the tuple ``(connect, read)``. ``None`` means wait
+            forever.
+        :type timeout: float or tuple or None
+
+        :param scheduler: A scheduler used to pace requests. Pass the same
+            scheduler to several instances to make them share the request
+            quota. If this is ``None``, requests are not paced.
+        :type scheduler: dnsmadeeasy.ratelimit.RequestScheduler or None
+
+        :param str entry_point: The URL of the API. If this is ``None``, the
+            live or sandbox API is used depending on ``sandbox``.
+
+        :param retry: The policy used to resend requests that failed
+            transiently. If this is ``None``, failed requests are not resent.
+        :type retry: dnsmadeeasy.retry.RetryPolicy or None
+
+        :param float rate_limit_timeout: The maximum number of seconds to wait
+            for the scheduler before giving up on a request rejected because
+            of the request limit. ``None`` means resend it as soon as the
+            scheduler allows. This is ignored without a scheduler.
         """
         super(DNSMadeEasyAPI, self).__init__(
-            self.ENTRY_POINT_SANDBOX if sandbox else self.ENTRY_POINT_LIVE,
+            entry_point or (
+                self.ENTRY_POINT_SANDBOX if sandbox else self.ENTRY_POINT_LIVE),
             headers = Headers(api_key, api_secret),
             verify = not sandbox)
+        self._timeout = timeout
+        self._scheduler = scheduler
+        self._retry = retry
+        self._rate_limit_timeout = rate_limit_timeout
+
+        #: The instrumentation hooks; see :class:`dnsmadeeasy.metrics.Hook`.
+        #: Children created after this list is replaced use the new list.
+        self.hooks = []
+
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections = pool_connections,
+            pool_maxsize = pool_maxsize,
+            max_retries = max_retries)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def _request(self, method, *args, **kwargs):
+        hooks = self.hooks
+        if not hooks:
+            return self._send(method, *args, **kwargs)
+
+        path = urlparse(self._url(*args)).path
+        for hook in hooks:
+            hook.before_request(method, path)
+        r = None
+        start = time.perf_counter()
+        try:
+            r = self._send(method, *args, **kwargs)
+            return r
+        finally:
+            event = RequestEvent.from_response(method, path, r,
+                time.perf_counter() - start)
+            for hook in hooks:
+                hook.after_request(event)
+
+    def _send(self, method, *args, **kwargs):
+        """Sends a request, pacing and resending it as configured.
+
+        If the request was resent after a failure that may have been applied
+        by the server, such as a server error or a timeout, the attribute
+        ``resent`` of the returned response is ``True``.
+        """
+        kwargs.setdefault('timeout', self._timeout)
+        if self._scheduler is None and self._retry is None:
+            return super(DNSMadeEasyAPI, self)._request(
+                method, *args, **kwargs)
+
+        attempt = 0
+        resent = False
+        deadline = None
+        while True:
+            # Once the deadline for a request rejected because of the request
+            # limit has passed, that response is returned
+            if self._scheduler is not None and not self._scheduler.acquire(
+                    rate_limit_wait(deadline)):
+                return r
+            try:
+                r = super(DNSMadeEasyAPI, self)._request(
+                    method, *args, **kwargs)
+            except requests.exceptions.RequestException as e:
+                if self._retry is None \
+                        or not self._retry.should_retry(method, exception = e):
+                    raise
+                delay = self._retry.delay(attempt)
+                if delay is None:
+                    raise
+                resent = True
+            else:
+                r.resent = resent
+                if self._scheduler is not None:
+                    self._scheduler.update(r.headers)
+
+                    # A request rejected because of the request limit has not
+                    # been applied, so it is safe to resend it once we have a
+                    # token; the scheduler then paces it, so the retry policy
+                    # must not resend it as well
+                    if is_rate_limited(r):
+                        if deadline is None \
+                                and self._rate_limit_timeout is not None:
+                            deadline = time.time() + self._rate_limit_timeout
+                        continue
+
+                if self._retry is None \
+                        or not self._retry.should_retry(method, response = r):
+                    return r
+                delay = self._retry.delay(attempt, r)
+                if delay is None:
+                    return r
+
+                # Requests rejected because of the request limit were never
+                # applied
+                resent = resent or not is_rate_limited(r)
+
+            self._retry.wait(delay)
+            attempt += 1
+
+    def close(self):
+        """Closes all pooled connections.
+        """
+        self._close_session()
@@ -0,0 +1,457 @@
+# coding: utf-8
+# libcloud-dnsmadeeasy
+# Copyright (C) 2014 Moses Palmér
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import re
+import requests
+import threading
+import time
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+from libcloud.common.types import LibcloudError
+from libcloud.dns.base import Record, Zone
+from libcloud.dns.types import RecordType, RecordAlreadyExistsError
+
+try:
+    import orjson as fast_json
+except ImportError:
+    try:
+        import ujson as fast_json
+    except ImportError:
+        fast_json = None
+
+from .cache import MemoryCache
+from .index import RecordIndex
+from .records import LazyRecord
+
+
+class DNSMadeEasyRateLimitExceededError(LibcloudError):
+    error_type = 'DNSMadeEasyRateLimitExceededError'
+    kwargs = ('requests_remaining')
+
+    def __init__(self, value, driver, request_limit):
+        self.request_limit = request_limit
+        super(DNSMadeEasyRateLimitExceededError, self).__init__(value = value,
+            driver = driver)
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __repr__(self):
+        return '<%s in %s, request_limit = %d, value = %s>' % (
+            self.error_type, repr(self.driver), self.request_limit, self.value)
+
+
+class DNSMadeEasyBase(object):
+    """
+    The parts of the DNSMadeEasy drivers that do not perform any I/O.
+
+    This class converts between DNSMadeEasy response items and libcloud
+    objects, maps errors and keeps the record indexes; the subclasses send
+    the requests.
+    """
+    name = 'DNSMadeEasy'
+    website = 'http://dnsmadeeasy.com'
+
+    RECORD_TYPE_MAP = {
+        'ANAME': 'ANAME',
+        RecordType.A: 'A',
+        RecordType.AAAA: 'AAAA',
+        RecordType.CNAME: 'CNAME',
+        RecordType.MX: 'MX',
+        RecordType.NS: 'NS',
+        RecordType.PTR: 'PTR',
+        RecordType.REDIRECT: 'HTTPRED',
+        RecordType.SOA: 'SOA',
+        RecordType.SPF: 'SPF',
+        RecordType.SRV: 'SRV',
+        RecordType.TXT: 'TXT'}
+
+    #: The maximum number of record indexes kept; the least recently used
+    #: indexes are discarded first
+    MAX_INDEXES = 64
+
+    ERROR_CODE_RE = re.compile(r'DE([0-9]+)\s*-\s*(.*)')
+
+    class ParsedError(Exception):
+        """A class used to pass parsed errors.
+        """
+        pass
+
+    def _init_state(self, api, index_ttl, lazy_records):
+        """Initialises the state shared by all drivers.
+
+        :param dnsmadeeasy.api.DNSMadeEasyAPI api: The API used to build
+            request URLs, and which holds the hooks.
+
+        :param int index_ttl: The number of seconds during which a record
+            index is used.
+
+        :param bool lazy_records: Whether to return :class:`LazyRecord`
+            instances.
+        """
+        self._api = api
+        self._index_ttl = index_ttl
+        self._record_indexes = MemoryCache(self.MAX_INDEXES)
+        self._record_types = {}
+        self._lazy_records = lazy_records
+        self._lock = threading.Lock()
+
+    def _raise_for_response(self, r):
+        """Raises a libcloud exception based on the server response.
+
+        If no error has occurred, this method does nothing.
+
+        If the error is unknown, a :exc:`requests.exceptions.HTTPError` is
+        raised.
+
+        :param requests.Response r: The server response.
+        """
+        try:
+            r.raise_for_status()
+
+        except requests.HTTPError as e:
+            if r.status_code == 400:
+                # Handle the request limit error here
+                requests_remaining = r.headers.get('x-dnsme-requestsRemaining',
+                    '')
+                if requests_remaining and int(requests_remaining) == 0:
+                    request_limit = int(
+                        r.headers.get('x-dnsme-requestLimit', '0'))
+                    raise DNSMadeEasyRateLimitExceededError(r, self,
+                        request_limit)
+
+                # Try to extract the error; this may fail since DNSMadeEasy may
+                # not necessarily return proper JSON
+                try:
+                    e = r.json().get('error', ['unknown'])
+                except:
+                    raise e
+
+                m = self.ERROR_CODE_RE.match(e[0])
+                if m:
+                    raise self.ParsedError(int(m.group(1)), m.group(2))
+                else:
+                    raise LibcloudError(e, self)
+
+            raise
+
+    def _to_full_record_name(self, domain, name = None):
+        """Converts a domain name and record name to a full record name.
+
+        If ``name`` is empty, it is considered to be the root record for the
+        domain, and ``domain`` is returned, otherwise ``name.domain``´is
+        returned.
+
+        :param str domain: The domain name.
+
+        :param name: The record name.
+        :type name: str or None
+
+        :return the full record name
+        :rtype: str
+        """
+        if name:
+            return '%s.%s' % (name, domain)
+        else:
+            return domain
+
+    def _to_partial_record_name(self, name):
+        """Converts a record name to a partial record name.
+
+        If ``name`` is empty, it is considered to be the root record for the
+        domain, and ``None`` is returned for consistency with other drivers.
+
+        :param name: The record name.
+        :type name: str or None
+
+        :return the record name
+        :rtype: str or None
+        """
+        # Map root names to None to be consistent with other drivers
+        if not name:
+            return None
+        else:
+            return name
+
+    def _to_zone(self, item):
+        """Converts a DNSMadeEasy zone response item to a ``Zone`` instance.
+
+        :param dict item: The response item.
+
+        :return: a zone
+        :rtype: libcloud.dns.base.Zone
+        """
+        return self._to_zones((item,))[0]
+
+    def _to_zones(self, items):
+        """Converts DNSMadeEasy zone response items to ``Zone`` instances.
+
+        :param items: The response items.
+
+        :return: a list of zones
+        :rtype: [libcloud.dns.base.Zone]
+        """
+        start = time.perf_counter() if self._api.hooks else None
+        zones = [
+            Zone(
+                id = str(item['id']),
+                domain = item['name'],
+                type = 'master',
+                ttl = None,
+                driver = self,
+                extra = {key: value
+                    for key, value in item.items()
+                    if not key in ('id', 'name')})
+            for item in items]
+        if start is not None:
+            self._report_conversion('zone', len(zones), start)
+        return zones
+
+    def _to_record(self, item, zone):
+        """Converts a DNSMadeEasy record response item to a ``Record`` instance.
+
+        :param dict item: The response item.
+
+        :param libcloud.dns.base.Zone zone: The zone to which the record
+            belongs.
+
+        :return: a record
+        :rtype: libcloud.dns.base.Record
+        """
+        return self._to_records((item,), zone)[0]
+
+    def _to_records(self, items, zone):
+        """Converts DNSMadeEasy record response items to ``Record`` instances.
+
+        This is equivalent to calling :meth:`_to_record` for every item, but
+        faster for large numbers of items: names are converted inline, record
+        types are shared between records and ``extra`` is built by copying the
+        item.
+
+        :param items: The response items.
+
+        :param libcloud.dns.base.Zone zone: The zone to which the records
+            belong.
+
+        :return: a list of records
+        :rtype: [libcloud.dns.base.Record]
+        """
+        start = time.perf_counter() if self._api.hooks else None
+        if self._lazy_records:
+            records = [LazyRecord(item, zone, self) for item in items]
+        else:
+            records = self._convert_records(items, zone)
+        if start is not None:
+            self._report_conversion('record', len(records), start)
+        return records
+
+    def _report_conversion(self, kind, count, start):
+        """Reports a conversion to the instrumentation hooks.
+
+        :param str kind: The kind of objects; either ``'zone'`` or
+            ``'record'``.
+
+        :param int count: The number of converted items.
+
+        :param float start: The value of :func:`time.perf_counter` when the
+            conversion started.
+        """
+        seconds = time.perf_counter() - start
+        for hook in self._api.hooks:
+            hook.after_convert(kind, count, seconds)
+
+    def _convert_records(self, items, zone):
+        """Performs the conversion for :meth:`_to_records`.
+        """
+        domain = zone.domain
+        suffix = '.' + domain
+        types = self._record_types
+
+        result = []
+        append = result.append
+        for item in items:
+            # Copying the item and removing the keys is considerably faster
+            # than filtering them in a comprehension; the second copy drops
+            # the space left by the removed keys
+            extra = dict(item)
+            id = extra.pop('id')
+            name = extra.pop('name')
+            type = extra.pop('type')
+            data = extra.pop('value')
+            extra = dict(extra)
+            extra['fqdn'] = name + suffix if name else domain
+
+            try:
+                type = types[type]
+            except KeyError:
+                type = types.setdefault(type, type.upper())
+
+            append(Record(
+                id = str(id),
+                name = name or None,
+                type = type,
+                data = data,
+                zone = zone,
+                driver = self,
+                extra = extra))
+
+        return result
+
+    def _decode(self, r):
+        """Decodes a JSON response.
+
+        A faster JSON decoder is used if one is installed.
+
+        :param requests.Response r: The server response.
+
+        :return: the decoded value
+        """
+        hooks = self._api.hooks
+        start = time.perf_counter() if hooks else None
+        if fast_json is not None:
+            value = fast_json.loads(r.content)
+        else:
+            value = r.json()
+        if start is not None:
+            seconds = time.perf_counter() - start
+            path = urlparse(r.url).path
+            for hook in hooks:
+                hook.after_decode(r.request.method, path, seconds)
+        return value
+
+    def _to_record_item(self, name, type, data, extra = None):
+        """Converts record values to a DNSMadeEasy record request item.
+
+        Default values are added for the values required by DNSMadeEasy.
+
+        :param str name: The record name.
+
+        :param str type: The record type.
+
+        :param str data: The record value.
+
+        :param extra: Additional values to send. This dict is updated with
+            the default values.
+        :type extra: dict or None
+
+        :return: a request item
+        :rtype: dict
+        """
+        if not extra:
+            extra = {}
+        if 'ttl' not in extra:
+            extra['ttl'] = 3600
+        if type == 'MX' and 'mxLevel' not in extra:
+            if 'priority' in extra:
+                extra['mxLevel'] = extra['priority']
+            else:
+                extra['mxLevel'] = 1
+        record = {
+            'name': name or '',
+            'type': type,
+            'value': data}
+        record.update(extra)
+
+        return record
+
+    def _raise_for_record_error(self, e, name):
+        """Raises the libcloud exception for a failed record creation.
+
+        :param libcloud.common.types.LibcloudError e: The error returned by
+            :meth:`_raise_for_response`.
+
+        :param str name: The name of the record that failed.
+        """
+        # There is unfortunately currently no way other that checking the
+        # error message to know whether the record already exits
+        if not isinstance(e, DNSMadeEasyRateLimitExceededError) \
+                and any('exists' in error for error in e.value):
+            raise RecordAlreadyExistsError(value = name, driver = self,
+                record_id = -1)
+        else:
+            raise e
+
+    def _index_records(self, zone, items):
+        """Creates a record index for a zone.
+
+        The index replaces the one kept for the zone only if ``index_ttl`` is
+        positive; otherwise it would never be used again.
+
+        :param libcloud.dns.base.Zone zone: The zone.
+
+        :param items: The record response items for the zone.
+
+        :return: the new index
+        :rtype: RecordIndex
+        """
+        index = RecordIndex(zone, items)
+        if self._index_ttl > 0:
+            self._record_indexes.set(zone.id, index, self._index_ttl)
+        return index
+
+    def _get_index(self, zone_id):
+        """Returns the record index kept for a zone.
+
+        :param str zone_id: The ID of the zone.
+
+        :return: the index, or ``None`` if no index is kept for the zone or
+            it has expired
+        :rtype: RecordIndex or None
+        """
+        try:
+            return self._record_indexes.get(zone_id)
+        except KeyError:
+            return None
+
+    def add_hook(self, hook):
+        """Registers an instrumentation hook.
+
+        :param dnsmadeeasy.metrics.Hook hook: The hook.
+        """
+        # The list is replaced rather than modified, since other threads may
+        # be iterating over it
+        with self._lock:
+            self._api.hooks = self._api.hooks + [hook]
+
+    def remove_hook(self, hook):
+        """Removes an instrumentation hook.
+
+        :param dnsmadeeasy.metrics.Hook hook: The hook.
+
+        :raises ValueError: if the hook is not registered
+        """
+        with self._lock:
+            hooks = list(self._api.hooks)
+            hooks.remove(hook)
+            self._api.hooks = hooks
+
+    def list_record_types(self):
+        return list(self.RECORD_TYPE_MAP.keys())
+
+    def _forget_zone(self, zone):
+        """Removes all local state for a zone.
+
+        :param libcloud.dns.base.Zone zone: The zone.
+
+        :return: the cache keys to invalidate for the zone
+        :rtype: [tuple]
+        """
+        self._record_indexes.delete(zone.id)
+        return [('zone', zone.id), ('records', zone.id)]
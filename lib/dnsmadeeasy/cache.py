@@ -0,0 +1,107 @@
+# coding: utf-8
+# libcloud-dnsmadeeasy
+# Copyright (C) 2014 Moses Palmér
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import collections
+import threading
+import time
+
+
+class Cache(object):
+    """The interface of caches used by the driver.
+
+    Keys are tuples of strings, and values are the decoded response items of
+    zones and records, or lists of them. Values thus consist only of dicts,
+    lists, strings, numbers and booleans, so implementations for shared
+    backends may serialise them as JSON. Values must not be modified.
+    """
+    def get(self, key):
+        """Returns a cached value.
+
+        :param tuple key: The key.
+
+        :return: the value
+
+        :raises KeyError: if the key is not cached or has expired
+        """
+        raise NotImplementedError()
+
+    def set(self, key, value, ttl):
+        """Caches a value.
+
+        :param tuple key: The key.
+
+        :param value: The value.
+
+        :param float ttl: The number of seconds for which the value is valid.
+        """
+        raise NotImplementedError()
+
+    def delete(self, key):
+        """Removes a value from the cache.
+
+        If the key is not cached, nothing happens.
+
+        :param tuple key: The key.
+        """
+        raise NotImplementedError()
+
+    def clear(self):
+        """Removes all values from the cache.
+        """
+        raise NotImplementedError()
+
+
+class MemoryCache(Cache):
+    def __init__(self, maxsize = 1024):
+        """An in-process cache with a least recently used eviction policy.
+
+        This class is thread safe.
+
+        :param int maxsize: The maximum number of values to keep.
+        """
+        self._maxsize = maxsize
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, key):
+        with self._lock:
+            expires, value = self._values[key]
+            if expires < time.time():
+                del self._values[key]
+                raise KeyError(key)
+
+            # Mark the value as recently used
+            del self._values[key]
+            self._values[key] = (expires, value)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._values.pop(key, None)
+            self._values[key] = (time.time() + ttl, value)
+            while len(self._values) > self._maxsize:
+                self._values.popitem(last = False)
+
+    def delete(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
@@ -14,210 +14,922 @@
 # You should have received a copy of the GNU General Public License along with
 # this program. If not, see <http://www.gnu.org/licenses/>.
 
+import collections
+import concurrent.futures
+import hashlib
+import itertools
 import json
 import re
 import requests
+import time
 
 from libcloud.common.types import LibcloudError
 from libcloud.dns.base import DNSDriver, Record, Zone
 from libcloud.dns.providers import set_driver
-from libcloud.dns.types import RecordType, ZoneAlreadyExistsError, \
-    ZoneDoesNotExistError, RecordAlreadyExistsError, RecordDoesNotExistError
+from libcloud.dns.types import ZoneAlreadyExistsError, \
+    ZoneDoesNotExistError, RecordDoesNotExistError
 
 from .api import DNSMadeEasyAPI
+from .base import DNSMadeEasyBase, DNSMadeEasyRateLimitExceededError
+from .cache import MemoryCache
+from .index import RecordIndex
+from .paging import Page
+from .ratelimit import RequestScheduler
+from .records import LazyRecord, RecordSnapshot
+from .retry import RetryPolicy
+from . import zonefile
 
 
-class DNSMadeEasyRateLimitExceededError(LibcloudError):
-    error_type = 'DNSMadeEasyRateLimitExceededError'
-    kwargs = ('requests_remaining')
+#: The result of :meth:`DNSMadeEasyDNSDriver.create_zones`
+CreateZonesResult = collections.namedtuple('CreateZonesResult', (
+    'created', 'existing'))
 
-    def __init__(self, value, driver, request_limit):
-        self.request_limit = request_limit
-        super(DNSMadeEasyRateLimitExceededError, self).__init__(value = value,
-            driver = driver)
+#: The changes made by :meth:`DNSMadeEasyDNSDriver.reconcile_zone`
+ReconcileReport = collections.namedtuple('ReconcileReport', (
+    'created', 'updated', 'deleted', 'unchanged'))
 
-    def __str__(self):
-        return self.__repr__()
 
-    def __repr__(self):
-        return '<%s in %s, request_limit = %d, value = %s>' % (
-            self.error_type, repr(self.driver), self.request_limit, self.value)
-
-
-class DNSMadeEasyDNSDriver(DNSDriver):
+class DNSMadeEasyDNSDriver(DNSMadeEasyBase, DNSDriver):
     """
     DNSMadeEasy DNS driver.
+
+    Instances are safe to share between threads; all threads then share one
+    pool of connections, and ``pool_maxsize`` should be at least the number of
+    threads.
     """
-    name = 'DNSMadeEasy'
-    website = 'http://dnsmadeeasy.com'
+    #: The default number of seconds for which cached values are valid, by
+    #: kind of value
+    CACHE_TTL = {
+        'zones': 60,
+        'zone': 60,
+        'records': 30}
+
+    #: The maximum number of records sent in a single bulk request
+    BATCH_SIZE = 100
+
+    #: The maximum number of listing pages kept for revalidation; the least
+    #: recently used pages are discarded first
+    MAX_PAGES = 256
 
-    RECORD_TYPE_MAP = {
-        'ANAME': 'ANAME',
-        RecordType.A: 'A',
-        RecordType.AAAA: 'AAAA',
-        RecordType.CNAME: 'CNAME',
-        RecordType.MX: 'MX',
-        RecordType.NS: 'NS',
-        RecordType.PTR: 'PTR',
-        RecordType.REDIRECT: 'HTTPRED',
-        RecordType.SOA: 'SOA',
-        RecordType.SPF: 'SPF',
-        RecordType.SRV: 'SRV',
-        RecordType.TXT: 'TXT'}
+    def _to_zones(self, items):
+        zones = super(DNSMadeEasyDNSDriver, self)._to_zones(items)
+        ttl = self._cache_ttl['zone']
+        for item, zone in zip(items, zones):
+            self._zone_items.set(zone.domain, item, ttl)
+        return zones
 
-    ERROR_CODE_RE = re.compile(r'DE([0-9]+)\s*-\s*(.*)')
+    def _to_updated_record(self, record, spec):
+        """Creates a copy of a record with values from a record specification.
 
-    class ParsedError(Exception):
-        """A class used to pass parsed errors.
+        :param libcloud.dns.base.Record record: The existing record.
+
+        :param dict spec: The record specification, with the same keys as the
+            items passed to :meth:`create_records`.
+
+        :return: a new record with the ID of ``record``
+        :rtype: libcloud.dns.base.Record
         """
-        pass
+        extra = dict(record.extra)
+        extra.update(spec.get('extra') or {})
+        return Record(record.id, spec['name'] or None, spec['type'],
+            spec['data'], record.zone, self, extra = extra)
 
-    def _raise_for_response(self, r):
-        """Raises a libcloud exception based on the server response.
+    def _find_record_item(self, zone, record):
+        """Retrieves the response item of an existing record.
 
-        If no error has occurred, this method does nothing.
+        :param libcloud.dns.base.Zone zone: The zone of the record.
 
-        If the error is unknown, a :exc:`requests.exceptions.HTTPError` is
-        raised.
+        :param dict record: The record request item.
 
-        :param requests.Response r: The server response.
+        :return: the response item, or ``None`` if no record with the same
+            name, type and value exists
+        :rtype: dict or None
+        """
+        r = self._api.dns.managed(zone.id).records.GET(
+            params = {
+                'recordName': record['name'],
+                'type': record['type']})
+        self._raise_for_response(r)
+        for item in self._decode(r)['data']:
+            if item['name'] == record['name'] \
+                    and item['type'] == record['type'] \
+                    and item['value'] == record['value']:
+                return item
+
+    def _create_record_item(self, zone, record):
+        """Creates a record.
+
+        If the request fails transiently and a retry policy is set, the
+        record is looked up before the request is resent, so that a request
+        that was applied although it failed is not applied twice.
+
+        Failures that the API already resends, such as requests rejected
+        because of the request limit, are not retried again here; those
+        requests were never applied, so the record is not looked up either.
+
+        :param libcloud.dns.base.Zone zone: The zone in which to create the
+            record.
+
+        :param dict record: The record request item.
+
+        :return: the response item
+        :rtype: dict
         """
+        attempt = 0
+        while True:
+            r, error = None, None
+            try:
+                r = self._api.dns.managed(zone.id).records.POST(
+                    data = json.dumps(record),
+                    headers = {
+                        'Content-Type': 'application/json'})
+            except requests.exceptions.RequestException as e:
+                error = e
+
+            retry = self._retry
+            if retry is None \
+                    or not retry.is_transient(r, error) \
+                    or retry.should_retry('POST', r, error):
+                break
+            delay = retry.delay(attempt, r)
+            if delay is None:
+                break
+            retry.wait(delay)
+            attempt += 1
+
+            item = self._find_record_item(zone, record)
+            if item is not None:
+                return item
+
+        if error is not None:
+            raise error
         try:
-            r.raise_for_status()
-
-        except requests.HTTPError as e:
-            if r.status_code == 400:
-                # Handle the request limit error here
-                requests_remaining = r.headers.get('x-dnsme-requestsRemaining',
-                    '')
-                if requests_remaining and int(requests_remaining) == 0:
-                    request_limit = r.headers.get('x-dnsme-requestLimit', '0')
-                    raise DNSMadeEasyRateLimitExceededError(r, self,
-                        request_limit)
-
-                # Try to extract the error; this may fail since DNSMadeEasy may
-                # not necessarily return proper JSON
-                try:
-                    e = r.json().get('error', ['unknown'])
-                except:
-                    raise e
+            self._raise_for_response(r)
+            return self._decode(r)
 
-                m = self.ERROR_CODE_RE.match(e[0])
-                if m:
-                    raise self.ParsedError(int(m.group(1)), m.group(2))
-                else:
-                    raise LibcloudError(e, self)
+        except LibcloudError as e:
+            self._raise_for_record_error(e, record['name'])
 
-            raise
+    def _create_record_items(self, zone, specs):
+        """Creates several records in a zone using a single request.
 
-    def _to_full_record_name(self, domain, name = None):
-        """Converts a domain name and record name to a full record name.
+        The record index for the zone is updated.
 
-        If ``name`` is empty, it is considered to be the root record for the
-        domain, and ``domain`` is returned, otherwise ``name.domain``´is
-        returned.
+        :param libcloud.dns.base.Zone zone: The zone in which to create the
+            records.
 
-        :param str domain: The domain name.
+        :param specs: The records to create, as passed to
+            :meth:`create_records`.
+        :type specs: [dict]
 
-        :param name: The record name.
-        :type name: str or None
+        :return: the response items of the created records
+        :rtype: [dict]
+        """
+        records = [
+            self._to_record_item(
+                spec['name'], spec['type'], spec['data'], spec.get('extra'))
+            for spec in specs]
 
-        :return the full record name
+        r = self._api.dns.managed(zone.id).records.createMulti.POST(
+            data = json.dumps(records),
+            headers = {
+                'Content-Type': 'application/json'})
+        try:
+            self._raise_for_response(r)
+            items = self._decode(r)
+
+        except LibcloudError as e:
+            self._raise_for_record_error(e, ', '.join(
+                str(record['name']) for record in records))
+
+        index = self._get_index(zone.id)
+        if index is not None:
+            for item in items:
+                index.add(item)
+        self._invalidate(('records', zone.id))
+
+        return items
+
+    def _to_zone_file_entry(self, item):
+        """Converts a DNSMadeEasy record response item to a line of a master
+        file.
+
+        :param dict item: The response item.
+
+        :return: the line, including the line terminator
         :rtype: str
         """
-        if name:
-            return '%s.%s' % (name, domain)
+        type = item['type']
+        value = item['value']
+        if type == 'MX':
+            rdata = '%d %s' % (item['mxLevel'], value)
+        elif type == 'SRV':
+            rdata = '%d %d %d %s' % (
+                item['priority'], item['weight'], item['port'], value)
+        elif type in ('TXT', 'SPF'):
+            rdata = zonefile.quote(value)
         else:
-            return domain
+            rdata = value
+        return zonefile.format_entry(item['name'], item.get('ttl'), type,
+            rdata)
+
+    def _from_zone_file_entry(self, entry, domain):
+        """Converts a resource record read from a master file to a record
+        specification.
 
-    def _to_partial_record_name(self, name):
-        """Converts a record name to a partial record name.
+        Record types are mapped through :attr:`RECORD_TYPE_MAP`, so both the
+        *libcloud* and DNSMadeEasy names of types are accepted.
 
-        If ``name`` is empty, it is considered to be the root record for the
-        domain, and ``None`` is returned for consistency with other drivers.
+        :param dnsmadeeasy.zonefile.Entry entry: The resource record.
 
-        :param name: The record name.
-        :type name: str or None
+        :param str domain: The domain name of the zone.
 
-        :return the record name
-        :rtype: str or None
+        :return: a record specification as passed to :meth:`create_records`,
+            or ``None`` for *SOA* records, which are managed by DNSMadeEasy
+        :rtype: dict or None
+
+        :raises dnsmadeeasy.zonefile.ZoneFileError: if the record is invalid
         """
-        # Map root names to None to be consistent with other drivers
-        if not name:
+        type = self.RECORD_TYPE_MAP.get(entry.type, entry.type)
+        if type == 'SOA':
             return None
+        elif not type in self.RECORD_TYPE_MAP.values():
+            raise zonefile.ZoneFileError(
+                'unsupported record type %s' % entry.type, entry.line)
+
+        rdata = entry.rdata
+        numbers = {'MX': 1, 'SRV': 3}.get(type, 0)
+        if type in ('TXT', 'SPF'):
+            valid = bool(rdata)
         else:
-            return name
+            valid = len(rdata) == numbers + 1 \
+                and all(value.isdigit() for value in rdata[:numbers])
+        if not valid:
+            raise zonefile.ZoneFileError(
+                'invalid %s record' % entry.type, entry.line)
 
-    def _to_zone(self, item):
-        """Converts a DNSMadeEasy zone response item to a ``Zone`` instance.
+        extra = {}
+        if entry.ttl is not None:
+            extra['ttl'] = entry.ttl
+        if type == 'MX':
+            extra['mxLevel'] = int(rdata[0])
+        elif type == 'SRV':
+            extra['priority'], extra['weight'], extra['port'] = (
+                int(value) for value in rdata[:3])
 
-        :param dict item: The response item.
+        if type in ('TXT', 'SPF'):
+            # Several character strings form one value, as for SPF
+            data = ''.join(zonefile.unquote(value) for value in rdata)
+        elif type in ('ANAME', 'CNAME', 'MX', 'NS', 'PTR', 'SRV') \
+                and (rdata[-1] == '@' or entry.origin != domain) \
+                and not rdata[-1].endswith('.'):
+            # Names relative to an origin other than the zone must be made
+            # absolute
+            data = zonefile.absolute_name(rdata[-1], entry.origin) + '.'
+        else:
+            data = rdata[-1]
 
-        :return: a zone
-        :rtype: libcloud.dns.base.Zone
+        return {
+            'name': entry.name,
+            'type': type,
+            'data': data,
+            'extra': extra}
+
+    def _existing_domains(self, r, domains):
+        """Returns the domains reported as already existing by a failed request
+        to create zones.
+
+        :param requests.Response r: The server response.
+
+        :param domains: The domains in the request.
+
+        :return: the existing domains; this is empty unless every error in the
+            response is about an existing domain, and ``None`` if every error
+            is about an existing domain, but not every domain is named
+        :rtype: set or None
         """
-        return Zone(
-            id = str(item['id']),
-            domain = item['name'],
-            type = 'master',
-            ttl = None,
-            driver = self,
-            extra = {key: value
-                for key, value in item.items()
-                if not key in ('id', 'name')})
+        if r.status_code != 400:
+            return set()
+        try:
+            errors = self._decode(r).get('error', [])
+        except (AttributeError, ValueError):
+            return set()
 
-    def _to_record(self, item, zone):
-        """Converts a DNSMadeEasy record response item to a ``Record`` instance.
+        existing = set()
+        unmatched = False
+        for error in errors:
+            m = self.ERROR_CODE_RE.match(error)
+            if not m or not int(m.group(1)) in (1, 2):
+                return set()
+            matches = [
+                domain
+                for domain in domains
+                if re.search(r'(?<![\w.-])%s(?![\w.-])' % re.escape(domain),
+                    m.group(2))]
+            if not matches:
+                unmatched = True
+            existing.update(matches)
 
-        :param dict item: The response item.
+        return None if unmatched else existing
 
-        :param libcloud.dns.base.Zone zone: The zone to which the record
-            belongs.
+    def _raise_for_missing_records(self, zone, records):
+        """Raises the libcloud exception for a bulk request that failed
+        because records do not exist.
 
-        :return: a record
-        :rtype: libcloud.dns.base.Record
+        The error response does not identify the missing records, so the
+        records of the zone are listed once to find them.
+
+        :param libcloud.dns.base.Zone zone: The zone of the records.
+
+        :param records: The records in the failed request.
+        :type records: [libcloud.dns.base.Record]
+
+        :raises libcloud.dns.types.RecordDoesNotExistError: always; the value
+            is the list of missing records, and the record ID is the ID of
+            the first missing record
         """
-        extra = {key: value
-            for key, value in item.items()
-            if not key in ('id', 'name', 'type', 'value')}
-        extra['fqdn'] = self._to_full_record_name(zone.domain, item['name'])
+        try:
+            ids = set(str(item['id'])
+                for item in self._list_record_items(zone))
+        except requests.exceptions.HTTPError:
+            ids = set()
+        missing = [record for record in records if not record.id in ids] \
+            or list(records)
+        raise RecordDoesNotExistError(
+            value = missing, driver = self, record_id = missing[0].id)
 
-        return Record(
-            id = str(item['id']),
-            name = self._to_partial_record_name(item['name']),
-            type = item['type'].upper(),
-            data = item['value'],
-            zone = zone,
-            driver = self,
-            extra = extra)
+    def _applied_deletion(self, r):
+        """Returns whether a failed deletion was applied by an earlier
+        attempt.
 
-    def __init__(self, api_key, api_secret, sandbox = False):
-        self._api = DNSMadeEasyAPI(api_key, api_secret, sandbox)
+        A deletion resent after a failure that was nevertheless applied, such
+        as a server error, fails with *404 Not Found*.
 
-    def list_record_types(self):
-        return list(self.RECORD_TYPE_MAP.keys())
+        :param requests.Response r: The server response.
 
-    def list_zones(self):
-        r = self._api.dns.managed.GET()
+        :rtype: bool
+        """
+        return r.status_code == 404 and getattr(r, 'resent', False)
+
+    def _chunks(self, items, size):
+        """Yields successive chunks of an iterable.
+
+        :param items: The items to split.
+
+        :param int size: The maximum size of a chunk.
+
+        :return: a generator yielding lists
+        """
+        items = iter(items)
+        while True:
+            chunk = list(itertools.islice(items, size))
+            if not chunk:
+                break
+            yield chunk
+
+    def _group_by_zone(self, records):
+        """Groups records by zone.
+
+        The order of the zones and of the records within a zone is kept.
+
+        :param records: The records to group.
+
+        :return: a list of the tuples ``(zone, [record])``
+        """
+        groups = collections.OrderedDict()
+        for record in records:
+            groups.setdefault(record.zone.id, (record.zone, []))[1].append(
+                record)
+        return list(groups.values())
+
+    def _cached(self, kind, key, load):
+        """Returns a value from the cache, loading it on a miss.
+
+        If no cache is used, ``load`` is always called.
+
+        :param str kind: The kind of value; this is a key in
+            :attr:`CACHE_TTL`.
+
+        :param str key: The key of the value, unique for ``kind``.
+
+        :param load: A callable returning the value. This must be a response
+            item or a list of response items; see
+            :class:`~dnsmadeeasy.cache.Cache`.
+
+        :return: the value
+        """
+        if self._cache is None:
+            return load()
+
+        try:
+            value = self._cache.get((kind, key))
+            with self._lock:
+                self._cache_hits += 1
+            return value
+        except KeyError:
+            # Loads in flight are tracked as the list [count, generation] per
+            # key, and the entry is removed when the last load has finished
+            with self._lock:
+                self._cache_misses += 1
+                loads = self._loads.setdefault((kind, key), [0, 0])
+                loads[0] += 1
+                generation = loads[1]
+            try:
+                value = load()
+
+                # Do not store a value loaded before a concurrent invalidation
+                with self._lock:
+                    if loads[1] == generation:
+                        self._cache.set((kind, key), value,
+                            self._cache_ttl[kind])
+                return value
+
+            finally:
+                with self._lock:
+                    loads[0] -= 1
+                    if not loads[0]:
+                        del self._loads[(kind, key)]
+
+    def _invalidate(self, *keys):
+        """Removes values from the cache.
+
+        :param keys: The keys to remove, as tuples ``(kind, key)``.
+        """
+        if self._cache is not None:
+            with self._lock:
+                for key in keys:
+                    loads = self._loads.get(key)
+                    if loads is not None:
+                        loads[1] += 1
+                    self._cache.delete(key)
+
+    def _get_page(self, endpoint, page = None, filters = None):
+        """Retrieves one page of a listing.
+
+        If revalidation is enabled, the previously retrieved page is returned
+        if the server responds with *304 Not Modified*, or if the response
+        body is identical.
+
+        :param hammock.Hammock endpoint: The endpoint to list.
+
+        :param page: The page to retrieve. If this is ``None`` and no page
+            size is set, no paging parameters are sent.
+        :type page: int or None
+
+        :param dict filters: Additional query parameters filtering the
+            listing.
+
+        :return: the page
+        :rtype: Page
+        """
+        params = dict(filters or {})
+        if self._page_size:
+            params['rows'] = self._page_size
+            params['page'] = page or 0
+        elif page is not None:
+            params['page'] = page
+
+        if not self._revalidate:
+            r = endpoint.GET(params = params)
+            self._raise_for_response(r)
+            return Page(self._decode(r))
+
+        key = (endpoint._url(), params.get('page'),
+            tuple(sorted((filters or {}).items())))
+        try:
+            previous = self._pages.get(key)
+        except KeyError:
+            previous = None
+        headers = {}
+        if previous is not None:
+            if previous.etag:
+                headers['If-None-Match'] = previous.etag
+            if previous.last_modified:
+                headers['If-Modified-Since'] = previous.last_modified
+
+        r = endpoint.GET(params = params, headers = headers)
+        if previous is not None and r.status_code == 304:
+            return previous
         self._raise_for_response(r)
 
-        items = r.json()['data']
-        return [self._to_zone(item)
-            for item in items]
+        # Servers not supporting validators may still send identical bodies
+        digest = hashlib.sha1(r.content).digest()
+        if previous is not None and previous.digest == digest:
+            return previous
+
+        current = Page(self._decode(r),
+            etag = r.headers.get('ETag'),
+            last_modified = r.headers.get('Last-Modified'),
+            digest = digest)
+        self._pages.set(key, current, float('inf'))
+        return current
+
+    def _iterate_pages(self, endpoint, filters = None):
+        """Yields every page of a listing.
+
+        Pages are retrieved until ``totalPages`` pages have been read. If
+        prefetching is enabled, the next page is retrieved in the background
+        while the current page is being consumed.
+
+        :param hammock.Hammock endpoint: The endpoint to list.
+
+        :param dict filters: Additional query parameters filtering the
+            listing.
+
+        :return: a generator yielding pages
+        """
+        executor = concurrent.futures.ThreadPoolExecutor(1) \
+            if self._prefetch \
+            else None
+        try:
+            page = self._get_page(endpoint, None, filters)
+            count = 1
+            while True:
+                # Use the page number from the response to avoid assuming
+                # whether pages are counted from 0 or 1
+                next_page = page.response.get('page', count - 1) + 1
+                has_next = count < page.response.get('totalPages', 1)
+
+                if has_next and executor:
+                    future = executor.submit(
+                        self._get_page, endpoint, next_page, filters)
+                yield page
+
+                if not has_next:
+                    break
+                page = future.result() \
+                    if executor \
+                    else self._get_page(endpoint, next_page, filters)
+                count += 1
+
+        finally:
+            if executor:
+                executor.shutdown(False)
+
+    def _list_record_items(self, zone):
+        """Retrieves the response items for all records of a zone.
+
+        :param libcloud.dns.base.Zone zone: The zone.
+
+        :return: a list of response items
+        :rtype: [dict]
+        """
+        return [item
+            for page in self._iterate_pages(
+                self._api.dns.managed(zone.id).records)
+            for item in page.items]
+
+    def __init__(self, api_key, api_secret, sandbox = False, index_ttl = 0,
+            pool_connections = 10, pool_maxsize = 10, max_retries = 0,
+            connect_timeout = None, read_timeout = None, page_size = None,
+            prefetch = False, scheduler = None, cache = None,
+            cache_ttl = None, revalidate = False, entry_point = None,
+            lazy_records = False, retry = None, rate_limit_timeout = None):
+        """Creates a DNSMadeEasy driver.
+
+        :param str api_key: The DNSMadeEasy API key.
+
+        :param str api_secret: The DNSMadeEasy secret.
+
+        :param bool sandbox: Whether to use the sandbox API.
+
+        :param int index_ttl: The number of seconds during which the record
+            index of a zone is used by :meth:`get_record` and
+            :meth:`find_records` without contacting the server. The default
+            value, ``0``, means that every lookup fetches the records of the
+            zone once, and that no indexes are kept. At most
+            :attr:`MAX_INDEXES` indexes are kept.
+
+        :param int pool_connections: The number of connection pools to cache.
+
+        :param int pool_maxsize: The maximum number of keep-alive connections
+            to keep open to the API host. This should be at least the number
+            of threads using this driver concurrently.
+
+        :param int max_retries: The number of times to retry failed
+            connections.
+
+        :param float connect_timeout: The timeout, in seconds, when
+            connecting to the API. ``None`` means wait forever.
+
+        :param float read_timeout: The timeout, in seconds, when waiting for a
+            response. ``None`` means wait forever.
+
+        :param int page_size: The number of items to request per page when
+            listing zones and records. ``None`` means use the server default.
+
+        :param bool prefetch: Whether to retrieve the next page of a listing
+            in the background while the current page is being consumed.
+
+        :param scheduler: A scheduler used to pace requests to stay under the
+            request limit. Pass ``True`` to use the scheduler shared by all
+            drivers in this process using the same API key. If this is
+            ``None``, requests are not paced, and exceeding the limit raises
+            :exc:`DNSMadeEasyRateLimitExceededError`.
+        :type scheduler: dnsmadeeasy.ratelimit.RequestScheduler or bool or
+            None
+
+        :param cache: A cache for the response items of zones and records.
+            Pass ``True`` to use a :class:`~dnsmadeeasy.cache.MemoryCache`. If
+            this is ``None``, nothing is cached.
+        :type cache: dnsmadeeasy.cache.Cache or bool or None
+
+        :param dict cache_ttl: The number of seconds for which cached values
+            are valid, overriding the values of :attr:`CACHE_TTL`.
+
+        :param bool revalidate: Whether to keep the last retrieved page of
+            listings and revalidate it with the server. Unchanged pages are
+            not decoded again. At most :attr:`MAX_PAGES` pages are kept.
+
+        :param str entry_point: The URL of the API. If this is ``None``, the
+            live or sandbox API is used depending on ``sandbox``.
+
+        :param bool lazy_records: Whether to return :class:`LazyRecord`
+            instances, which compute ``extra`` only when accessed.
+
+        :param retry: The policy used to resend requests that failed
+            transiently. Pass ``True`` to use a
+            :class:`~dnsmadeeasy.retry.RetryPolicy` with the default values.
+            If this is ``None``, failed requests are not resent.
+        :type retry: dnsmadeeasy.retry.RetryPolicy or bool or None
+
+        :param float rate_limit_timeout: The maximum number of seconds to wait
+            for the scheduler before giving up on a request rejected because
+            of the request limit, and raising
+            :exc:`DNSMadeEasyRateLimitExceededError`. ``None`` means resend
+            the request as soon as the scheduler allows, however long that
+            takes. This is ignored without a scheduler.
+        """
+        if scheduler is True:
+            scheduler = RequestScheduler.shared(api_key)
+        if retry is True:
+            retry = RetryPolicy()
+        if cache is True:
+            cache = MemoryCache()
+
+        self._init_state(
+            DNSMadeEasyAPI(api_key, api_secret, sandbox,
+                pool_connections = pool_connections,
+                pool_maxsize = pool_maxsize,
+                max_retries = max_retries,
+                timeout = (connect_timeout, read_timeout),
+                scheduler = scheduler or None,
+                entry_point = entry_point,
+                retry = retry or None,
+                rate_limit_timeout = rate_limit_timeout),
+            index_ttl,
+            lazy_records)
+        self._retry = retry or None
+        self._page_size = page_size
+        self._prefetch = prefetch
+        self._cache = cache if cache is not False else None
+        self._cache_ttl = dict(self.CACHE_TTL, **(cache_ttl or {}))
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._loads = {}
+        self._revalidate = revalidate
+        self._pages = MemoryCache(self.MAX_PAGES)
+        self._zone_items = MemoryCache()
+
+    def close(self):
+        """Closes all connections to the API.
+        """
+        self._api.close()
+
+    @property
+    def cache_stats(self):
+        """The number of cache hits and misses, as the dict
+        ``{'hits': hits, 'misses': misses}``"""
+        with self._lock:
+            return {
+                'hits': self._cache_hits,
+                'misses': self._cache_misses}
+
+    @property
+    def retry_stats(self):
+        """The number of retries and the total time spent waiting before them,
+        as the dict ``{'retries': retries, 'backoff_time': seconds}``"""
+        if self._retry is None:
+            return {
+                'retries': 0,
+                'backoff_time': 0.0}
+        else:
+            return self._retry.stats
+
+    def iterate_zones(self):
+        for page in self._iterate_pages(self._api.dns.managed):
+            for zone in self._to_zones(page.items):
+                yield zone
+
+    def list_zones(self):
+        return self._to_zones(self._cached('zones', '',
+            lambda: [item
+                for page in self._iterate_pages(self._api.dns.managed)
+                for item in page.items]))
+
+    def iterate_records(self, zone):
+        for page in self._iterate_pages(
+                self._api.dns.managed(zone.id).records):
+            for record in self._to_records(page.items, zone):
+                yield record
 
     def list_records(self, zone):
-        r = self._api.dns.managed(zone.id).records.GET()
-        self._raise_for_response(r)
+        def load():
+            items = self._list_record_items(zone)
+            if self._index_ttl > 0:
+                self._index_records(zone, items)
+            return items
+        return self._to_records(self._cached('records', zone.id, load), zone)
+
+    def snapshot_records(self, zone):
+        """Retrieves all records of a zone as a compact snapshot.
+
+        The snapshot is built from the same listing as :meth:`list_records`,
+        but no records are created until they are accessed, and the
+        response items are not kept.
+
+        :param libcloud.dns.base.Zone zone: The zone.
+
+        :rtype: RecordSnapshot
+        """
+        snapshot = RecordSnapshot(zone, self)
+        for page in self._iterate_pages(
+                self._api.dns.managed(zone.id).records):
+            snapshot.extend(page.items)
+        return snapshot
+
+    def find_records(self, zone, name = None, type = None, data = None):
+        """Finds the records of a zone matching a filter.
+
+        If the record index of the zone is fresh, see ``index_ttl``, it is
+        used without contacting the server. Otherwise, if no index is kept and
+        a name or type is given, the server filters the records. In all other
+        cases, the records of the zone are listed once to refresh the index.
+
+        :param libcloud.dns.base.Zone zone: The zone.
 
-        items = r.json()['data']
-        return [self._to_record(item, zone)
-            for item in items]
+        :param str name: The partial record name to match, or ``None`` to
+            match any name. The zone apex has the name ``''``.
+
+        :param str type: The record type to match, or ``None`` to match any
+            type.
+
+        :param str data: The record value to match, or ``None`` to match any
+            value.
+
+        :return: the matching records
+        :rtype: [libcloud.dns.base.Record]
+        """
+        index = self._get_index(zone.id)
+        if index is None or not index.is_fresh(self._index_ttl):
+            if self._index_ttl <= 0 and (name is not None or type is not None):
+                filters = {}
+                if name is not None:
+                    filters['recordName'] = name
+                if type is not None:
+                    filters['type'] = type
+                index = RecordIndex(zone, [
+                    item
+                    for page in self._iterate_pages(
+                        self._api.dns.managed(zone.id).records, filters)
+                    for item in page.items])
+            else:
+                index = self._index_records(zone,
+                    self._list_record_items(zone))
+
+        return self._to_records(index.find(name, type, data), zone)
+
+    def reconcile_zone(self, zone, desired_records, dry_run = False):
+        """Changes the records of a zone to match a list of desired records.
+
+        Records are identified by name, type and value. A desired record
+        whose ``extra`` values differ from those of the existing record is
+        updated; only the keys present in the desired ``extra`` are compared.
+        Existing records that are not desired are reused for desired records
+        with the same name and type before being deleted, so that a changed
+        value requires only an update.
+
+        The changes are applied with :meth:`delete_records`,
+        :meth:`update_records` and :meth:`create_records`, in that order.
+
+        :param libcloud.dns.base.Zone zone: The zone to reconcile.
+
+        :param desired_records: The desired records. Every item is a ``dict``
+            with the same keys as the items passed to
+            :meth:`create_records`.
+        :type desired_records: [dict]
+
+        :param bool dry_run: Whether to only compute the changes. If this is
+            ``True``, the created records in the report have the ID
+            ``None``.
+
+        :return: the created, updated, deleted and unchanged records
+        :rtype: ReconcileReport
+        """
+        current = {}
+        deleted = []
+        for record in self.list_records(zone):
+            key = (record.name or '', record.type, record.data)
+            if key in current:
+                deleted.append(record)
+            else:
+                current[key] = record
+
+        created = []
+        updated = []
+        unchanged = []
+        desired = set()
+        for spec in desired_records:
+            key = (spec['name'] or '', spec['type'], spec['data'])
+            if key in desired:
+                continue
+            desired.add(key)
+
+            record = current.pop(key, None)
+            extra = spec.get('extra') or {}
+            if record is None:
+                created.append(spec)
+            elif any(record.extra.get(k) != v for k, v in extra.items()):
+                updated.append(self._to_updated_record(record, spec))
+            else:
+                unchanged.append(record)
+
+        # Reuse superfluous records with the same name and type
+        superfluous = collections.defaultdict(list)
+        for (name, type, data), record in current.items():
+            superfluous[(name, type)].append(record)
+        specs = []
+        for spec in created:
+            records = superfluous.get((spec['name'] or '', spec['type']))
+            if records:
+                updated.append(self._to_updated_record(records.pop(), spec))
+            else:
+                specs.append(spec)
+        deleted.extend(
+            record
+            for records in superfluous.values()
+            for record in records)
+
+        if dry_run:
+            created = [
+                Record(None, spec['name'] or None, spec['type'], spec['data'],
+                    zone, self, extra = dict(spec.get('extra') or {}))
+                for spec in specs]
+        else:
+            self.delete_records(deleted)
+            updated = self.update_records(updated)
+            created = self.create_records(zone, specs)
+
+        return ReconcileReport(created, updated, deleted, unchanged)
+
+    def list_records_many(self, zones, max_workers = 8):
+        """Lists the records of several zones concurrently.
+
+        The records are retrieved on a pool of at most ``max_workers``
+        threads. If retrieving the records of any zone fails, the remaining
+        retrievals are cancelled and the exception, for example
+        :exc:`DNSMadeEasyRateLimitExceededError`, is raised.
+
+        :param zones: The zones whose records to list.
+
+        :param int max_workers: The maximum number of concurrent requests.
+            This should not be greater than the connection pool size.
+
+        :return: a generator yielding the tuple ``(zone, records)`` for every
+            zone as soon as its records have been retrieved
+        """
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+        futures = {}
+        try:
+            for zone in zones:
+                futures[executor.submit(self.list_records, zone)] = zone
+            for future in concurrent.futures.as_completed(futures):
+                yield futures[future], future.result()
+
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(False)
 
     def get_zone(self, zone_id):
+        return self._to_zone(self._cached('zone', str(zone_id),
+            lambda: self._get_zone_item(zone_id)))
+
+    def _get_zone_item(self, zone_id):
+        """Retrieves the response item of a zone.
+
+        :param zone_id: The ID of the zone.
+
+        :return: the response item
+        :rtype: dict
+
+        :raises libcloud.dns.types.ZoneDoesNotExistError: if the zone does
+            not exist
+        """
         r = self._api.dns.managed(zone_id).GET()
         try:
             self._raise_for_response(r)
-            return self._to_zone(r.json())
+            return self._decode(r)
 
         except requests.exceptions.HTTPError as e:
             if r.status_code == 404:
@@ -226,23 +938,92 @@ class DNSMadeEasyDNSDriver(DNSDriver):
             else:
                 raise
 
-    def get_record(self, zone_id, record_id):
-        # Get the Zone; this will raise ZoneDoesNotExistError if zone_id is
-        # invalid
-        zone = self.get_zone(zone_id)
+    def get_zone_by_domain(self, domain):
+        """Returns the zone for a domain.
 
-        r = self._api.dns.managed(zone.id).records.GET()
-        self._raise_for_response(r)
+        The response items of the zones retrieved or created by this driver
+        are remembered for as long as zones are cached, see
+        :attr:`CACHE_TTL`, so a known domain is resolved without contacting
+        the server. Other domains are looked up by name.
 
-        items = r.json()['data']
+        :param str domain: The domain name.
+
+        :return: a zone
+        :rtype: libcloud.dns.base.Zone
+
+        :raises libcloud.dns.types.ZoneDoesNotExistError: if no zone exists
+            for the domain
+        """
+        # Do not convert the remembered item with _to_zones, which would
+        # remember it again and thus never let it expire
+        try:
+            return super(DNSMadeEasyDNSDriver, self)._to_zones(
+                (self._zone_items.get(domain),))[0]
+        except KeyError:
+            pass
+
+        r = self._api.dns.managed.id(domain).GET()
         try:
-            return next(self._to_record(item, zone)
-                for item in items
-                if str(item['id']) == record_id)
+            self._raise_for_response(r)
+            return self._to_zone(self._decode(r))
+
+        except requests.exceptions.HTTPError as e:
+            if r.status_code == 404:
+                raise ZoneDoesNotExistError(
+                    value = domain, driver = self, zone_id = '')
+            else:
+                raise
+
+    def _forget_zone(self, zone):
+        self._zone_items.delete(zone.domain)
+        return super(DNSMadeEasyDNSDriver, self)._forget_zone(zone)
+
+    def get_record(self, zone_id, record_id):
+        """Returns a record.
+
+        :param zone_id: The zone ID, or the zone itself. Passing a zone saves
+            a request.
+        :type zone_id: str or libcloud.dns.base.Zone
 
-        except StopIteration:
+        :param str record_id: The record ID.
+
+        :return: a record
+        :rtype: libcloud.dns.base.Record
+        """
+        if isinstance(zone_id, Zone):
+            zone = zone_id
+        else:
+            index = self._get_index(str(zone_id))
+            if index is not None and index.is_fresh(self._index_ttl):
+                zone = index.zone
+            else:
+                # Get the Zone; this will raise ZoneDoesNotExistError if
+                # zone_id is invalid
+                zone = self.get_zone(zone_id)
+
+        # DNSMadeEasy does not support retrieving a single record, so we use an
+        # index of the records of the zone; it is refreshed if stale or if it
+        # does not contain the record
+        record_id = str(record_id)
+        index = self._get_index(zone.id)
+        if index is None \
+                or not index.is_fresh(self._index_ttl) \
+                or not record_id in index:
+            try:
+                index = self._index_records(zone,
+                    self._list_record_items(zone))
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code == 404:
+                    raise ZoneDoesNotExistError(
+                        value = '', driver = self, zone_id = zone.id)
+                else:
+                    raise
+
+        item = index.get(record_id)
+        if item is None:
             raise RecordDoesNotExistError(
                 value = '', driver = self, record_id = record_id)
+        return self._to_record(item, zone)
 
     def create_zone(self, domain, type = 'master', ttl = None, extra = None):
         r = self._api.dns.managed.POST(
@@ -253,7 +1034,9 @@ class DNSMadeEasyDNSDriver(DNSDriver):
 
         try:
             self._raise_for_response(r)
-            return self._to_zone(r.json())
+            zone = self._to_zone(self._decode(r))
+            self._invalidate(('zones', ''))
+            return zone
 
         except self.ParsedError as e:
             code, message = e.args
@@ -263,38 +1046,278 @@ class DNSMadeEasyDNSDriver(DNSDriver):
             else:
                 raise
 
-    def create_record(self, name, zone, type, data, extra = None):
-        if not extra:
-            extra = {}
-        if 'ttl' not in extra:
-            extra['ttl'] = 3600
-        if type == 'MX' and 'mxLevel' not in extra:
-            if 'priority' in extra:
-                extra['mxLevel'] = extra['priority']
-            else:
-                extra['mxLevel'] = 1
-        record = {
-            'name': name,
-            'type': type,
-            'value': data}
-        record.update(extra)
+    def create_zones(self, domains, chunk_size = None):
+        """Creates several zones.
 
-        r = self._api.dns.managed(zone.id).records.POST(
-            data = json.dumps(record),
-            headers = {
-                'Content-Type': 'application/json'})
+        The zones are created in as few requests as possible, using chunks of
+        at most ``chunk_size`` domains. Domains that already exist do not fail
+        the request; they are removed from the chunk, which is then sent
+        again. If the errors do not name the existing domains, the chunk is
+        split in halves, which are sent separately, until every existing
+        domain is found. If a response does not include the created zones,
+        they are retrieved with a single listing of all zones.
+
+        :param domains: The domain names of the zones to create.
+        :type domains: [str]
+
+        :param int chunk_size: The maximum number of domains per request. If
+            this is ``None``, :attr:`BATCH_SIZE` is used.
+
+        :return: the created zones, and the domains that already existed
+        :rtype: CreateZonesResult
+        """
+        created = collections.OrderedDict()
+        existing = []
         try:
-            self._raise_for_response(r)
-            return self._to_record(r.json(), zone)
+            for chunk in self._chunks(domains, chunk_size or self.BATCH_SIZE):
+                pending = [chunk]
+                while pending:
+                    chunk = pending.pop(0)
+                    r = self._api.dns.managed.POST(
+                        data = json.dumps({
+                            'names': chunk}),
+                        headers = {
+                            'Content-Type': 'application/json'})
+                    duplicates = self._existing_domains(r, chunk)
+                    if duplicates is None:
+                        if len(chunk) > 1:
+                            middle = len(chunk) // 2
+                            pending[:0] = [chunk[:middle], chunk[middle:]]
+                            continue
+                        duplicates = set(chunk)
+                    if duplicates:
+                        existing.extend(
+                            domain for domain in chunk if domain in duplicates)
+                        chunk = [
+                            domain
+                            for domain in chunk
+                            if not domain in duplicates]
+                        if chunk:
+                            pending.insert(0, chunk)
+                        continue
 
-        except LibcloudError as e:
-            # There is unfortunately currently no way other that checking the
-            # error message to know whether the record already exits
-            if any('exists' in error for error in e.value):
-                raise RecordAlreadyExistsError(value = name, driver = self,
-                    record_id = -1)
-            else:
-                raise
+                    try:
+                        self._raise_for_response(r)
+                    except self.ParsedError as e:
+                        raise LibcloudError('DE%d - %s' % e.args, self)
+
+                    response = self._decode(r)
+                    for domain in chunk:
+                        created[domain] = None
+                    for item in response if isinstance(response, list) \
+                            else [response]:
+                        if isinstance(item, dict):
+                            zone = self._to_zone(item)
+                            created[zone.domain] = zone
+
+        finally:
+            self._invalidate(('zones', ''))
+
+        if any(zone is None for zone in created.values()):
+            for zone in self.iterate_zones():
+                if created.get(zone.domain, zone) is None:
+                    created[zone.domain] = zone
+
+        return CreateZonesResult(
+            [zone for zone in created.values() if zone is not None],
+            existing)
+
+    def create_record(self, name, zone, type, data, extra = None):
+        record = self._to_record_item(name, type, data, extra)
+        item = self._create_record_item(zone, record)
+
+        index = self._get_index(zone.id)
+        if index is not None:
+            index.add(item)
+        self._invalidate(('records', zone.id))
+        return self._to_record(item, zone)
+
+    def create_records(self, zone, specs):
+        """Creates several records in a zone.
+
+        The records are created in as few requests as possible, using chunks
+        of at most :attr:`BATCH_SIZE` records.
+
+        :param libcloud.dns.base.Zone zone: The zone in which to create the
+            records.
+
+        :param specs: The records to create. Every item is a ``dict`` with the
+            keys ``name``, ``type``, ``data`` and optionally ``extra``, which
+            have the same meaning as the corresponding arguments to
+            :meth:`create_record`.
+        :type specs: [dict]
+
+        :return: the created records
+        :rtype: [libcloud.dns.base.Record]
+
+        :raises libcloud.dns.types.RecordAlreadyExistsError: if a record
+            already exists; records in earlier chunks will have been created
+        """
+        result = []
+        for chunk in self._chunks(specs, self.BATCH_SIZE):
+            result.extend(self._to_records(
+                self._create_record_items(zone, chunk), zone))
+
+        return result
+
+    def export_zone(self, zone, fileobj):
+        """Writes all records of a zone to a file in the master file format
+        described in RFC 1035.
+
+        The records are listed and written one page at a time, so the memory
+        used does not depend on the size of the zone when paging is enabled.
+
+        Record types are written using their DNSMadeEasy names, the values of
+        :attr:`RECORD_TYPE_MAP`. This includes the non-standard types
+        *ANAME* and *HTTPRED*, which other DNS servers will not accept; for
+        *HTTPRED* records, only the target URL is written. The values of
+        *TXT* and *SPF* records are written as one quoted character string,
+        so that :meth:`import_zone` restores them unchanged.
+
+        :param libcloud.dns.base.Zone zone: The zone to export.
+
+        :param fileobj: The text file to which to write.
+
+        :return: the number of written records
+        :rtype: int
+        """
+        fileobj.write('$ORIGIN %s.\n' % zone.domain)
+        count = 0
+        for page in self._iterate_pages(
+                self._api.dns.managed(zone.id).records):
+            fileobj.writelines(
+                self._to_zone_file_entry(item) for item in page.items)
+            count += len(page.items)
+        return count
+
+    def import_zone(self, zone, fileobj):
+        """Creates the records of a master file in a zone.
+
+        The file is read incrementally, and the records are created in chunks
+        of :attr:`BATCH_SIZE` records as they are read, so the memory used
+        does not depend on the size of the file.
+
+        Record types are mapped through :attr:`RECORD_TYPE_MAP`, so both
+        *REDIRECT* and *HTTPRED* are accepted for HTTP redirections. *SOA*
+        records are ignored, since DNSMadeEasy manages them. The character
+        strings of *TXT* and *SPF* records are unquoted, unescaped and
+        concatenated.
+
+        :param libcloud.dns.base.Zone zone: The zone in which to create the
+            records.
+
+        :param fileobj: The file to read, as returned by :meth:`export_zone`
+            or another DNS server.
+
+        :return: the number of created records
+        :rtype: int
+
+        :raises dnsmadeeasy.zonefile.ZoneFileError: if the file is invalid;
+            records in earlier chunks will have been created
+
+        :raises libcloud.dns.types.RecordAlreadyExistsError: if a record
+            already exists; records in earlier chunks will have been created
+        """
+        specs = (
+            spec
+            for spec in (
+                self._from_zone_file_entry(entry, zone.domain)
+                for entry in zonefile.read(fileobj, zone.domain))
+            if spec is not None)
+
+        count = 0
+        for chunk in self._chunks(specs, self.BATCH_SIZE):
+            count += len(self._create_record_items(zone, chunk))
+        return count
+
+    def update_records(self, records):
+        """Updates several records.
+
+        The new values are read from the ``name``, ``type``, ``data`` and
+        ``extra`` attributes of the records. The records are updated in as
+        few requests as possible, using one request per zone and chunk of at
+        most :attr:`BATCH_SIZE` records.
+
+        :param records: The records to update.
+        :type records: [libcloud.dns.base.Record]
+
+        :return: the updated records
+        :rtype: [libcloud.dns.base.Record]
+
+        :raises libcloud.dns.types.RecordDoesNotExistError: if a record does
+            not exist; ``record_id`` is the ID of the first missing record,
+            and ``value`` the list of missing records in the chunk. Records
+            in earlier chunks will have been updated
+        """
+        result = []
+        for zone, zone_records in self._group_by_zone(records):
+            for chunk in self._chunks(zone_records, self.BATCH_SIZE):
+                items = []
+                for record in chunk:
+                    extra = {key: value
+                        for key, value in record.extra.items()
+                        if not key in ('fqdn', 'id')}
+                    item = self._to_record_item(
+                        record.name, record.type, record.data, extra)
+                    item['id'] = int(record.id)
+                    items.append(item)
+
+                r = self._api.dns.managed(zone.id).records.updateMulti.PUT(
+                    data = json.dumps(items),
+                    headers = {
+                        'Content-Type': 'application/json'})
+                try:
+                    self._raise_for_response(r)
+                except requests.exceptions.HTTPError as e:
+                    if r.status_code == 404:
+                        self._raise_for_missing_records(zone, chunk)
+                    else:
+                        raise
+
+                index = self._get_index(zone.id)
+                for item in items:
+                    if index is not None:
+                        index.add(item)
+                    result.append(self._to_record(item, zone))
+                self._invalidate(('records', zone.id))
+
+        return result
+
+    def delete_records(self, records):
+        """Deletes several records.
+
+        The records are deleted in as few requests as possible, using one
+        request per zone and chunk of at most :attr:`BATCH_SIZE` records.
+
+        :param records: The records to delete.
+        :type records: [libcloud.dns.base.Record]
+
+        :raises libcloud.dns.types.RecordDoesNotExistError: if a record does
+            not exist; ``record_id`` is the ID of the first missing record,
+            and ``value`` the list of missing records in the chunk. Records
+            in earlier chunks will have been deleted
+        """
+        for zone, zone_records in self._group_by_zone(records):
+            for chunk in self._chunks(zone_records, self.BATCH_SIZE):
+                r = self._api.dns.managed(zone.id).records.DELETE(
+                    params = {
+                        'ids': [record.id for record in chunk]})
+
+                try:
+                    self._raise_for_response(r)
+                except requests.exceptions.HTTPError as e:
+                    if self._applied_deletion(r):
+                        pass
+                    elif r.status_code == 404:
+                        self._raise_for_missing_records(zone, chunk)
+                    else:
+                        raise
+
+                index = self._get_index(zone.id)
+                if index is not None:
+                    for record in chunk:
+                        index.remove(record.id)
+                self._invalidate(('records', zone.id))
 
     def delete_zone(self, zone):
         r = self._api.dns.managed(zone.id).DELETE()
@@ -303,23 +1326,120 @@ class DNSMadeEasyDNSDriver(DNSDriver):
             self._raise_for_response(r)
 
         except requests.exceptions.HTTPError as e:
-            if r.status_code == 404:
+            if self._applied_deletion(r):
+                pass
+            elif r.status_code == 404:
                 raise ZoneDoesNotExistError(
                     value = zone, driver = self, zone_id = zone.id)
             else:
                 raise
 
+        self._invalidate(('zones', ''), *self._forget_zone(zone))
+
+    def delete_zones(self, zones):
+        """Deletes several zones.
+
+        The zones are deleted in as few requests as possible, using chunks of
+        at most :attr:`BATCH_SIZE` zones. DNSMadeEasy keeps deleted zones with
+        a pending action for a while; use :meth:`wait_for_zone_deletion` to
+        wait until they are gone.
+
+        :param zones: The zones to delete.
+        :type zones: [libcloud.dns.base.Zone]
+
+        :raises libcloud.dns.types.ZoneDoesNotExistError: if a zone does not
+            exist; zones in earlier chunks will have been deleted
+        """
+        for chunk in self._chunks(zones, self.BATCH_SIZE):
+            r = self._api.dns.managed.DELETE(
+                data = json.dumps([int(zone.id) for zone in chunk]),
+                headers = {
+                    'Content-Type': 'application/json'})
+
+            try:
+                self._raise_for_response(r)
+            except requests.exceptions.HTTPError as e:
+                if self._applied_deletion(r):
+                    pass
+                elif r.status_code == 404:
+                    raise ZoneDoesNotExistError(
+                        value = chunk, driver = self, zone_id = chunk[0].id)
+                else:
+                    raise
+
+            keys = [('zones', '')]
+            for zone in chunk:
+                keys.extend(self._forget_zone(zone))
+            self._invalidate(*keys)
+
+    def wait_for_zone_deletion(self, zones, timeout = None, interval = 1.0,
+            max_interval = 32.0):
+        """Waits until deleted zones no longer exist.
+
+        Every poll lists all zones once. The delay between polls is kept while
+        deletions complete, and doubled up to ``max_interval`` when none
+        completed since the previous poll.
+
+        :param zones: The deleted zones.
+        :type zones: [libcloud.dns.base.Zone]
+
+        :param float timeout: The maximum number of seconds to wait. If this is
+            ``None``, this method waits until all zones are gone.
+
+        :param float interval: The initial delay between polls, in seconds.
+
+        :param float max_interval: The maximum delay between polls, in
+            seconds.
+
+        :return: the zones that still existed when the timeout expired; this
+            is empty if all zones are gone
+        :rtype: [libcloud.dns.base.Zone]
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        pending = {zone.id: zone for zone in zones}
+        delay = None
+        while pending:
+            existing = set(zone.id for zone in self.iterate_zones())
+            count = len(pending)
+            pending = {
+                zone_id: zone
+                for zone_id, zone in pending.items()
+                if zone_id in existing}
+            if not pending:
+                break
+            if delay is None:
+                delay = interval
+            elif len(pending) == count:
+                delay = min(delay * 2, max_interval)
+
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                time.sleep(min(delay, remaining))
+            else:
+                time.sleep(delay)
+
+        return list(pending.values())
+
     def delete_record(self, record):
         r = self._api.dns.managed(record.zone.id).records(record.id).DELETE()
 
         try:
             self._raise_for_response(r)
         except:
-            if r.status_code == 404:
+            if self._applied_deletion(r):
+                pass
+            elif r.status_code == 404:
                 raise RecordDoesNotExistError(
                     value = record, driver = self, record_id = record.id)
             else:
                 raise
 
+        index = self._get_index(record.zone.id)
+        if index is not None:
+            index.remove(record.id)
+        self._invalidate(('records', record.zone.id))
+
 
 set_driver('dnsmadeeasy', __name__, DNSMadeEasyDNSDriver.__name__)
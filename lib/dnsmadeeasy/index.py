@@ -0,0 +1,169 @@
+# coding: utf-8
+# libcloud-dnsmadeeasy
+# Copyright (C) 2014 Moses Palmér
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+
+
+class RecordIndex(object):
+    def __init__(self, zone, items):
+        """An index of the records of a zone.
+
+        The index maps record IDs to the raw response items, and records are
+        converted only when looked up. Lookups by name, type and value are
+        built the first time :meth:`find` is called.
+
+        This class is thread safe.
+
+        :param libcloud.dns.base.Zone zone: The zone to which the records
+            belong.
+
+        :param items: The record response items.
+        """
+        self.zone = zone
+        self.timestamp = time.time()
+        self._items = {str(item['id']): item for item in items}
+
+        # The lookups from name, type and value to sets of record IDs; these
+        # and the items are modified only with the lock held
+        self._lookups = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, record_id):
+        return record_id in self._items
+
+    def _keys(self, item):
+        """Returns the lookup keys of a response item.
+
+        :param dict item: The response item.
+
+        :return: the name, type and value of the item
+        :rtype: tuple
+        """
+        return (item['name'] or '', item['type'], item['value'])
+
+    def _link(self, record_id, item):
+        """Adds a response item to the lookups, if they are built.
+
+        This method must be called with the lock held.
+        """
+        if self._lookups is not None:
+            for lookup, key in zip(self._lookups, self._keys(item)):
+                lookup.setdefault(key, set()).add(record_id)
+
+    def _unlink(self, record_id, item):
+        """Removes a response item from the lookups, if they are built.
+
+        This method must be called with the lock held.
+        """
+        if self._lookups is not None:
+            for lookup, key in zip(self._lookups, self._keys(item)):
+                ids = lookup.get(key)
+                if ids is not None:
+                    ids.discard(record_id)
+                    if not ids:
+                        del lookup[key]
+
+    def get(self, record_id):
+        """Returns the response item for a record.
+
+        :param str record_id: The record ID.
+
+        :return: the response item, or ``None`` if the record is not indexed
+        :rtype: dict or None
+        """
+        return self._items.get(record_id)
+
+    def find(self, name = None, type = None, data = None):
+        """Returns the response items of all records matching a filter.
+
+        The smallest set of candidates given by the name, type and value
+        lookups is checked, so a query for a name or value only inspects the
+        records with that name or value.
+
+        :param str name: The partial record name to match, or ``None`` to
+            match any name. The zone apex has the name ``''``.
+
+        :param str type: The record type to match, or ``None`` to match any
+            type.
+
+        :param str data: The record value to match, or ``None`` to match any
+            value.
+
+        :return: a list of response items
+        :rtype: [dict]
+        """
+        query = (name, type, data)
+        with self._lock:
+            if self._lookups is None:
+                self._lookups = ({}, {}, {})
+                for record_id, item in self._items.items():
+                    self._link(record_id, item)
+
+            candidates = None
+            for lookup, key in zip(self._lookups, query):
+                if key is not None:
+                    ids = lookup.get(key, ())
+                    if candidates is None or len(ids) < len(candidates):
+                        candidates = ids
+            if candidates is None:
+                candidates = self._items.keys()
+
+            result = []
+            for record_id in candidates:
+                item = self._items[record_id]
+                if all(
+                        expected is None or expected == actual
+                        for expected, actual in zip(
+                            query, self._keys(item))):
+                    result.append(item)
+            return result
+
+    def add(self, item):
+        """Adds a response item to this index.
+
+        If the record is already indexed, it is replaced.
+
+        :param dict item: The response item.
+        """
+        record_id = str(item['id'])
+        with self._lock:
+            previous = self._items.get(record_id)
+            if previous is not None:
+                self._unlink(record_id, previous)
+            self._items[record_id] = item
+            self._link(record_id, item)
+
+    def remove(self, record_id):
+        """Removes a record from this index.
+
+        If the record is not indexed, nothing happens.
+
+        :param str record_id: The record ID.
+        """
+        with self._lock:
+            item = self._items.pop(record_id, None)
+            if item is not None:
+                self._unlink(record_id, item)
+
+    def is_fresh(self, ttl):
+        """Returns whether this index is younger than ``ttl`` seconds.
+
+        :param int ttl: The maximum age of the index, in seconds.
+
+        :rtype: bool
+        """
+        return time.time() - self.timestamp < ttl
@@ -0,0 +1,302 @@
+# coding: utf-8
+# libcloud-dnsmadeeasy
+# Copyright (C) 2014 Moses Palmér
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import bisect
+import re
+import threading
+
+
+#: Matches numeric path segments, which are replaced when grouping requests
+#: by endpoint
+ID_RE = re.compile(r'/\d+(?=/|$)')
+
+
+def endpoint(method, path):
+    """Returns the name of the endpoint of a request.
+
+    Numeric path segments are replaced with ``{id}``, so that requests for
+    different zones and records are grouped together.
+
+    :param str method: The HTTP method.
+
+    :param str path: The path of the URL.
+
+    :return: a name like ``'GET /dns/managed/{id}/records'``
+    :rtype: str
+    """
+    return '%s %s' % (method.upper(), ID_RE.sub('/{id}', path.rstrip('/')))
+
+
+class RequestEvent(object):
+    __slots__ = ('method', 'path', 'status', 'bytes', 'network_time',
+        'requests_remaining')
+
+    def __init__(self, method, path, status, bytes, network_time,
+            requests_remaining):
+        """A completed request.
+
+        :param str method: The HTTP method.
+
+        :param str path: The path of the URL.
+
+        :param int status: The status code of the response, or ``None`` if no
+            response was received.
+
+        :param int bytes: The size of the response body.
+
+        :param float network_time: The number of seconds spent sending the
+            request and receiving the response, including any retries.
+
+        :param int requests_remaining: The value of the
+            ``x-dnsme-requestsRemaining`` header, or ``None`` if it was not
+            sent.
+        """
+        self.method = method
+        self.path = path
+        self.status = status
+        self.bytes = bytes
+        self.network_time = network_time
+        self.requests_remaining = requests_remaining
+
+    @classmethod
+    def from_response(cls, method, path, r, network_time):
+        """Creates an event for a response.
+
+        :param str method: The HTTP method.
+
+        :param str path: The path of the URL.
+
+        :param r: The response, or ``None`` if the request failed.
+
+        :param float network_time: The number of seconds spent sending the
+            request and receiving the response.
+
+        :rtype: RequestEvent
+        """
+        if r is None:
+            return cls(method, path, None, 0, network_time, None)
+
+        requests_remaining = r.headers.get('x-dnsme-requestsRemaining')
+        return cls(method, path, r.status_code, len(r.content), network_time,
+            int(requests_remaining) if requests_remaining else None)
+
+
+class Hook(object):
+    """The interface of instrumentation hooks.
+
+    Hooks are called synchronously by the thread making the request, so they
+    must be fast and thread safe. All methods do nothing by default.
+    """
+    def before_request(self, method, path):
+        """Called before a request is sent.
+
+        :param str method: The HTTP method.
+
+        :param str path: The path of the URL.
+        """
+        pass
+
+    def after_request(self, event):
+        """Called when a request has completed or failed.
+
+        :param RequestEvent event: The request.
+        """
+        pass
+
+    def after_decode(self, method, path, seconds):
+        """Called when a response body has been decoded.
+
+        :param str method: The HTTP method of the request.
+
+        :param str path: The path of the URL of the request.
+
+        :param float seconds: The time spent decoding.
+        """
+        pass
+
+    def after_convert(self, kind, count, seconds):
+        """Called when response items have been converted to libcloud
+        objects.
+
+        :param str kind: The kind of objects; either ``'zone'`` or
+            ``'record'``.
+
+        :param int count: The number of converted items.
+
+        :param float seconds: The time spent converting.
+        """
+        pass
+
+
+class Histogram(object):
+    #: The default bucket bounds, suitable for durations in seconds
+    BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+        1.0, 2.5, 5.0, 10.0)
+
+    #: Bucket bounds suitable for sizes in bytes
+    BYTES_BOUNDS = tuple(4 ** i for i in range(4, 13))
+
+    def __init__(self, bounds = None):
+        """A histogram with fixed buckets.
+
+        This class is not thread safe.
+
+        :param bounds: The inclusive upper bounds of the buckets, in
+            increasing order. A final bucket holds all larger values.
+        :type bounds: tuple or None
+        """
+        self.bounds = tuple(bounds or self.BOUNDS)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Adds a value.
+
+        :param value: The value to add.
+        """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Returns an upper bound for a quantile of the values.
+
+        :param float q: The quantile, between ``0.0`` and ``1.0``.
+
+        :return: the upper bound of the bucket containing the quantile, or the
+            largest value if it is in the last bucket, or ``None`` if no values
+            have been added
+        """
+        if not self.count:
+            return None
+        target = q * self.count
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            if total >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self):
+        """Returns the state of this histogram.
+
+        :return: a dict with the keys ``count``, ``sum``, ``min``, ``max``,
+            ``p50``, ``p90``, ``p99`` and ``buckets``, the last being a list
+            of tuples ``(upper bound, count)``
+        :rtype: dict
+        """
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'buckets': list(zip(self.bounds + (None,), self.counts))}
+
+
+class MetricsAggregator(Hook):
+    def __init__(self):
+        """A hook collecting histograms per endpoint in memory.
+
+        Requests are grouped by :func:`endpoint`, and conversions by kind.
+        """
+        self._endpoints = {}
+        self._conversions = {}
+        self._requests_remaining = None
+        self._lock = threading.Lock()
+
+    def _endpoint(self, method, path):
+        """Returns the metrics of an endpoint, creating them if necessary.
+
+        This method must be called with the lock held.
+
+        :param str method: The HTTP method.
+
+        :param str path: The path of the URL.
+        """
+        key = endpoint(method, path)
+        try:
+            return self._endpoints[key]
+        except KeyError:
+            metrics = self._endpoints[key] = {
+                'network_time': Histogram(),
+                'decode_time': Histogram(),
+                'bytes': Histogram(Histogram.BYTES_BOUNDS),
+                'statuses': {}}
+            return metrics
+
+    def after_request(self, event):
+        with self._lock:
+            metrics = self._endpoint(event.method, event.path)
+            metrics['network_time'].add(event.network_time)
+            metrics['bytes'].add(event.bytes)
+            statuses = metrics['statuses']
+            statuses[event.status] = statuses.get(event.status, 0) + 1
+            if event.requests_remaining is not None:
+                self._requests_remaining = event.requests_remaining
+
+    def after_decode(self, method, path, seconds):
+        with self._lock:
+            self._endpoint(method, path)['decode_time'].add(seconds)
+
+    def after_convert(self, kind, count, seconds):
+        with self._lock:
+            try:
+                histogram = self._conversions[kind]
+            except KeyError:
+                histogram = self._conversions[kind] = Histogram()
+            histogram.add(seconds / count if count else 0.0)
+
+    def snapshot(self):
+        """Returns the collected metrics.
+
+        :return: a dict with the keys ``endpoints``, mapping endpoint names to
+            dicts of histogram snapshots and status code counts,
+            ``conversions``, mapping kinds to snapshots of histograms of the
+            time per converted item, and ``requests_remaining``, the last seen
+            number of remaining requests
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'endpoints': {
+                    key: {
+                        name: value.snapshot()
+                            if isinstance(value, Histogram)
+                            else dict(value)
+                        for name, value in metrics.items()}
+                    for key, metrics in self._endpoints.items()},
+                'conversions': {
+                    kind: histogram.snapshot()
+                    for kind, histogram in self._conversions.items()},
+                'requests_remaining': self._requests_remaining}
+
+    def clear(self):
+        """Removes all collected metrics.
+        """
+        with self._lock:
+            self._endpoints.clear()
+            self._conversions.clear()
+            self._requests_remaining = None
@@ -0,0 +1,38 @@
+# coding: utf-8
+# libcloud-dnsmadeeasy
+# Copyright (C) 2014 Moses Palmér
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+class Page(object):
+    def __init__(self, response, etag = None, last_modified = None,
+            digest = None):
+        """A page of a listing.
+
+        :param dict response: The decoded response. Pages may be kept for
+            revalidation, so the items must be converted every time they are
+            used, and must not be modified.
+
+        :param str etag: The value of the ``ETag`` header of the response.
+
+        :param str last_modified: The value of the ``Last-Modified`` header of
+            the response.
+
+        :param bytes digest: A digest of the response body.
+        """
+        self.response = response
+        self.items = response['data']
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
@@ -0,0 +1,156 @@
+# coding: utf-8
+# libcloud-dnsmadeeasy
+# Copyright (C) 2014 Moses Palmér
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+
+
+class RequestScheduler(object):
+    #: The number of requests allowed per window by DNSMadeEasy, until the
+    #: server has told us otherwise
+    DEFAULT_REQUEST_LIMIT = 150
+
+    #: The length of the rolling window, in seconds, during which at most the
+    #: request limit of requests may be made
+    WINDOW = 300
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, request_limit = DEFAULT_REQUEST_LIMIT,
+            window = WINDOW):
+        """A token bucket scheduler pacing requests to stay under the request
+        limit.
+
+        The bucket holds at most ``request_limit`` tokens and is refilled at a
+        rate of ``request_limit / window`` tokens per second. Every request
+        consumes one token.
+
+        The bucket is corrected by :meth:`update` from the
+        ``x-dnsme-requestLimit`` and ``x-dnsme-requestsRemaining`` headers of
+        every response.
+
+        Instances are thread safe, and may be shared by several drivers; see
+        :meth:`shared`.
+
+        :param int request_limit: The initial request limit.
+
+        :param int window: The length, in seconds, of the window during which
+            at most ``request_limit`` requests may be made.
+        """
+        self._window = window
+        self._request_limit = request_limit
+        self._tokens = float(request_limit)
+        self._timestamp = time.time()
+        self._condition = threading.Condition()
+
+    @classmethod
+    def shared(self, api_key):
+        """Returns the scheduler shared by all users of an API key in this
+        process.
+
+        :param str api_key: The API key.
+
+        :return: a scheduler
+        :rtype: RequestScheduler
+        """
+        with self._shared_lock:
+            try:
+                return self._shared[api_key]
+            except KeyError:
+                scheduler = self()
+                self._shared[api_key] = scheduler
+                return scheduler
+
+    @property
+    def request_limit(self):
+        """The number of requests allowed per window"""
+        return self._request_limit
+
+    @property
+    def tokens(self):
+        """The number of requests that may currently be made without waiting"""
+        with self._condition:
+            self._refill()
+            return self._tokens
+
+    def _refill(self):
+        """Adds the tokens accumulated since the last refill.
+
+        This method must be called with the condition held.
+        """
+        now = time.time()
+        self._tokens = min(
+            float(self._request_limit),
+            self._tokens + (now - self._timestamp)
+                * self._request_limit / self._window)
+        self._timestamp = now
+
+    def acquire(self, timeout = None):
+        """Consumes one token, waiting until one is available.
+
+        :param timeout: The maximum number of seconds to wait. ``None`` means
+            wait forever.
+        :type timeout: float or None
+
+        :return: whether a token was consumed
+        :rtype: bool
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while True:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+
+                # Wait until the next token should be available
+                delay = (1.0 - self._tokens) \
+                    * self._window / self._request_limit
+                if deadline is not None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False
+                    delay = min(delay, remaining)
+                self._condition.wait(delay)
+
+    def update(self, headers):
+        """Updates the bucket from response headers.
+
+        The number of tokens is never raised above the number of remaining
+        requests reported by the server, since other clients may share the
+        quota.
+
+        :param headers: The response headers.
+        :type headers: requests.structures.CaseInsensitiveDict
+        """
+        try:
+            request_limit = int(headers.get('x-dnsme-requestLimit', ''))
+        except ValueError:
+            request_limit = None
+        try:
+            requests_remaining = int(
+                headers.get('x-dnsme-requestsRemaining', ''))
+        except ValueError:
+            requests_remaining = None
+
+        with self._condition:
+            self._refill()
+            if request_limit:
+                self._request_limit = request_limit
+            if requests_remaining is not None:
+                self._tokens = min(self._tokens, float(requests_remaining))
+            self._condition.notify_all()
@@ -0,0 +1,359 @@
+# coding: utf-8
+# libcloud-dnsmadeeasy
+# Copyright (C) 2014 Moses Palmér
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import array
+import sys
+
+from libcloud.dns.base import Record
+
+
+#: The keys of record response items not copied to ``Record.extra``
+RECORD_ITEM_KEYS = frozenset(('id', 'name', 'type', 'value'))
+
+
+class LazyRecord(Record):
+    """A record computing its values from a response item when accessed.
+
+    Only a reference to the response item is kept, so records that are never
+    inspected beyond ``name``, ``type`` and ``data`` never allocate an
+    ``extra`` dict or a full record name.
+
+    Instances still have a ``__dict__``, since :class:`Record` does.
+    """
+
+    #: DNSMadeEasy records have no TTL in the libcloud sense
+    ttl = None
+
+    def __init__(self, item, zone, driver):
+        """Creates a lazy record.
+
+        :param dict item: The record response item. This must not be modified
+            later.
+
+        :param libcloud.dns.base.Zone zone: The zone to which the record
+            belongs.
+
+        :param DNSMadeEasyDNSDriver driver: The driver.
+        """
+        self._item = item
+        self._values = None
+        self.zone = zone
+        self.driver = driver
+
+    def _get(self, key, default):
+        """Returns a value set on this record, or ``default``.
+        """
+        values = self._values
+        return values.get(key, default) if values else default
+
+    def _set(self, key, value):
+        """Sets a value on this record, overriding the response item.
+        """
+        if self._values is None:
+            self._values = {}
+        self._values[key] = value
+
+    @property
+    def id(self):
+        return self._get('id', None) or str(self._item['id'])
+
+    @id.setter
+    def id(self, value):
+        self._set('id', value)
+
+    @property
+    def name(self):
+        return self._get('name', self._item['name'] or None)
+
+    @name.setter
+    def name(self, value):
+        self._set('name', value)
+
+    @property
+    def type(self):
+        return self._get('type', None) or self._item['type'].upper()
+
+    @type.setter
+    def type(self, value):
+        self._set('type', value)
+
+    @property
+    def data(self):
+        return self._get('data', self._item['value'])
+
+    @data.setter
+    def data(self, value):
+        self._set('data', value)
+
+    @property
+    def fqdn(self):
+        """The full record name"""
+        name = self.name
+        return '%s.%s' % (name, self.zone.domain) if name else self.zone.domain
+
+    @property
+    def extra(self):
+        extra = self._get('extra', None)
+        if extra is None:
+            excluded = RECORD_ITEM_KEYS
+            extra = {key: value
+                for key, value in self._item.items()
+                if not key in excluded}
+            extra['fqdn'] = self.fqdn
+            self._set('extra', extra)
+        return extra
+
+    @extra.setter
+    def extra(self, value):
+        self._set('extra', value)
+
+
+class RecordSnapshot(object):
+    #: The value stored in the numeric columns for missing values
+    MISSING = -1
+
+    def __init__(self, zone, driver, types = None, extras = None):
+        """A compact, columnar snapshot of the records of a zone.
+
+        Record IDs, TTLs and MX levels are stored in arrays, record types and
+        the remaining ``extra`` values are stored as indexes into tables
+        shared by all records, and names are interned. Records are only
+        created when accessed.
+
+        The positions of the records are kept by name and by type, so
+        filtering inspects only the records with the requested name or type.
+
+        :param libcloud.dns.base.Zone zone: The zone to which the records
+            belong.
+
+        :param DNSMadeEasyDNSDriver driver: The driver used to create records.
+
+        :param list types: The table of record types. This is shared with
+            snapshots created by :meth:`select`.
+
+        :param list extras: The table of remaining ``extra`` values. This is
+            shared with snapshots created by :meth:`select`.
+        """
+        self.zone = zone
+        self.driver = driver
+        self.ids = array.array('q')
+        self.ttls = array.array('l')
+        self.mx_levels = array.array('l')
+        self.names = []
+        self.values = []
+        self.type_codes = array.array('B')
+        self.extra_codes = array.array('L')
+        self._by_name = {}
+        self._by_type = {}
+        self._types = [] if types is None else types
+        self._extras = [] if extras is None else extras
+        self._type_codes = {t: i for i, t in enumerate(self._types)}
+        self._extra_codes = {}
+        for i, extra in enumerate(self._extras):
+            try:
+                self._extra_codes[extra] = i
+            except TypeError:
+                pass
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        return self.record(index)
+
+    def __iter__(self):
+        for index in range(len(self.ids)):
+            yield self.record(index)
+
+    @property
+    def types(self):
+        """The record types present in this snapshot"""
+        return [self._types[code] for code in sorted(self._by_type)]
+
+    def _code(self, table, codes, value):
+        """Returns the index of a value in a table, adding it if necessary.
+
+        :param list table: The table of values.
+
+        :param dict codes: A mapping from value to index in ``table``.
+
+        :param value: The value to look up.
+
+        :return: the index of the value
+        :rtype: int
+        """
+        try:
+            return codes[value]
+        except KeyError:
+            codes[value] = len(table)
+            table.append(value)
+            return codes[value]
+        except TypeError:
+            # Unhashable values are stored without sharing
+            table.append(value)
+            return len(table) - 1
+
+    def _append(self, id, ttl, mx_level, name, value, type_code,
+            extra_code):
+        """Adds a record to the columns and the lookups.
+        """
+        index = len(self.ids)
+        self.ids.append(id)
+        self.ttls.append(ttl)
+        self.mx_levels.append(mx_level)
+        self.names.append(name)
+        self.values.append(value)
+        self.type_codes.append(type_code)
+        self.extra_codes.append(extra_code)
+
+        # Most names are unique, so single positions are stored as integers
+        positions = self._by_name.get(name)
+        if positions is None:
+            self._by_name[name] = index
+        elif positions.__class__ is int:
+            self._by_name[name] = [positions, index]
+        else:
+            positions.append(index)
+        positions = self._by_type.get(type_code)
+        if positions is None:
+            self._by_type[type_code] = array.array('L', (index,))
+        else:
+            positions.append(index)
+
+    def extend(self, items):
+        """Adds response items to this snapshot.
+
+        The items are not referenced by this snapshot.
+
+        :param items: The record response items.
+        """
+        missing = self.MISSING
+        excluded = RECORD_ITEM_KEYS.union(('ttl', 'mxLevel'))
+        intern = sys.intern
+        code = self._code
+        append = self._append
+        types, type_codes = self._types, self._type_codes
+        extras, extra_codes = self._extras, self._extra_codes
+        for item in items:
+            name = item['name']
+            append(
+                int(item['id']),
+                item.get('ttl', missing),
+                item.get('mxLevel', missing),
+                intern(name) if name else '',
+                item['value'],
+                code(types, type_codes, item['type'].upper()),
+                code(extras, extra_codes, tuple(
+                    (key, value)
+                    for key, value in item.items()
+                    if not key in excluded)))
+
+    def item(self, index):
+        """Recreates the response item of a record.
+
+        :param int index: The index of the record in this snapshot.
+
+        :return: a response item
+        :rtype: dict
+        """
+        item = dict(self._extras[self.extra_codes[index]])
+        item['id'] = self.ids[index]
+        item['name'] = self.names[index]
+        item['type'] = self._types[self.type_codes[index]]
+        item['value'] = self.values[index]
+        if self.ttls[index] != self.MISSING:
+            item['ttl'] = self.ttls[index]
+        if self.mx_levels[index] != self.MISSING:
+            item['mxLevel'] = self.mx_levels[index]
+        return item
+
+    def record(self, index):
+        """Creates the record at an index.
+
+        :param int index: The index of the record in this snapshot.
+
+        :rtype: libcloud.dns.base.Record
+        """
+        return self.driver._to_record(self.item(index), self.zone)
+
+    def indexes(self, name = None, type = None):
+        """Returns the indexes of all records matching a filter.
+
+        :param str name: The partial record name to match, or ``None`` to
+            match any name. The zone apex has the name ``''``.
+
+        :param str type: The record type to match, or ``None`` to match any
+            type.
+
+        :return: a list of indexes, in increasing order
+        :rtype: [int]
+        """
+        if name is not None:
+            by_name = self._by_name.get(name, ())
+            if by_name.__class__ is int:
+                by_name = (by_name,)
+        else:
+            by_name = None
+        if type is not None:
+            code = self._type_codes.get(type)
+            by_type = self._by_type.get(code, ()) if code is not None else ()
+        else:
+            by_type = None
+
+        if by_name is None and by_type is None:
+            return list(range(len(self.ids)))
+        elif by_type is None:
+            return list(by_name)
+        elif by_name is None:
+            return list(by_type)
+
+        # Check the shorter list against the other column
+        if len(by_name) <= len(by_type):
+            type_codes = self.type_codes
+            return [i for i in by_name if type_codes[i] == code]
+        else:
+            names = self.names
+            return [i for i in by_type if names[i] == name]
+
+    def select(self, name = None, type = None):
+        """Returns a snapshot of all records matching a filter.
+
+        The returned snapshot shares the type and ``extra`` tables of this
+        snapshot.
+
+        :param str name: The partial record name to match, or ``None`` to
+            match any name. The zone apex has the name ``''``.
+
+        :param str type: The record type to match, or ``None`` to match any
+            type.
+
+        :rtype: RecordSnapshot
+        """
+        result = RecordSnapshot(self.zone, self.driver,
+            self._types, self._extras)
+        result._type_codes = self._type_codes
+        result._extra_codes = self._extra_codes
+        append = result._append
+        for i in self.indexes(name, type):
+            append(
+                self.ids[i],
+                self.ttls[i],
+                self.mx_levels[i],
+                self.names[i],
+                self.values[i],
+                self.type_codes[i],
+                self.extra_codes[i])
+        return result
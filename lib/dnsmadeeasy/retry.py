@@ -0,0 +1,178 @@
+# coding: utf-8
+# libcloud-dnsmadeeasy
+# Copyright (C) 2014 Moses Palmér
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import random
+import requests
+import threading
+import time
+
+from .api import is_rate_limited
+from .ratelimit import RequestScheduler
+
+
+class RetryPolicy(object):
+    def __init__(self, max_retries = 3, backoff = 0.5, max_backoff = 30.0,
+            jitter = True, methods = ('GET', 'HEAD', 'DELETE'),
+            window = RequestScheduler.WINDOW):
+        """A policy for retrying requests that failed transiently.
+
+        Requests that fail with a server error, a connection error or a
+        timeout are retried only if their method is idempotent. Requests
+        rejected because of the request limit are always retried, since they
+        were never applied.
+
+        The delay before retry ``n`` (counting from ``0``) is
+        ``backoff * 2 ** n``, limited to ``max_backoff``. With jitter, a
+        random delay between ``0`` and that value is used instead. A
+        ``Retry-After`` header in the response overrides the computed delay.
+
+        Requests rejected because of the request limit are instead resent
+        once the quota allows another request: DNSMadeEasy allows
+        ``x-dnsme-requestLimit`` requests per ``window``, so one request
+        becomes available every ``window / limit`` seconds. This delay is
+        doubled for every retry, up to ``window``, after which the whole quota
+        is available again. To avoid exceeding the limit in the first place,
+        use a :class:`~dnsmadeeasy.ratelimit.RequestScheduler`.
+
+        :param int max_retries: The maximum number of times to retry a
+            request.
+
+        :param float backoff: The delay before the first retry, in seconds.
+
+        :param float max_backoff: The maximum delay before a retry, in
+            seconds.
+
+        :param bool jitter: Whether to randomise the delays.
+
+        :param methods: The HTTP methods of requests that are safe to resend.
+
+        :param int window: The length, in seconds, of the window during which
+            at most the request limit of requests may be made.
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.methods = frozenset(method.upper() for method in methods)
+        self.window = window
+
+        self._retries = 0
+        self._backoff_time = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self):
+        """The number of retries and the total time spent waiting before them,
+        as the dict ``{'retries': retries, 'backoff_time': seconds}``"""
+        with self._lock:
+            return {
+                'retries': self._retries,
+                'backoff_time': self._backoff_time}
+
+    def is_transient(self, response = None, exception = None):
+        """Returns whether a failure is transient.
+
+        :param requests.Response response: The response, if one was
+            received.
+
+        :param Exception exception: The exception raised when sending the
+            request, if any.
+
+        :rtype: bool
+        """
+        if exception is not None:
+            return isinstance(exception, (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout))
+        else:
+            return response.status_code >= 500 or is_rate_limited(response)
+
+    def should_retry(self, method, response = None, exception = None):
+        """Returns whether a failed request may be resent.
+
+        :param str method: The HTTP method of the request.
+
+        :param requests.Response response: The response, if one was
+            received.
+
+        :param Exception exception: The exception raised when sending the
+            request, if any.
+
+        :rtype: bool
+        """
+        if not self.is_transient(response, exception):
+            return False
+        elif exception is None and is_rate_limited(response):
+            return True
+        else:
+            return method.upper() in self.methods
+
+    def delay(self, attempt, response = None):
+        """Returns the number of seconds to wait before a retry.
+
+        :param int attempt: The number of retries already made for the
+            request.
+
+        :param requests.Response response: The response, if one was
+            received.
+
+        :return: the delay, or ``None`` if no more retries should be made
+        :rtype: float or None
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        retry_after = response.headers.get('Retry-After') \
+            if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+
+        if response is not None and is_rate_limited(response):
+            return self._rate_limit_delay(attempt, response)
+
+        delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def _rate_limit_delay(self, attempt, response):
+        """Returns the number of seconds to wait before resending a request
+        rejected because of the request limit.
+
+        :param int attempt: The number of retries already made for the
+            request.
+
+        :param requests.Response response: The response.
+
+        :rtype: float
+        """
+        try:
+            request_limit = int(response.headers['x-dnsme-requestLimit'])
+        except (KeyError, ValueError):
+            request_limit = RequestScheduler.DEFAULT_REQUEST_LIMIT
+        interval = float(self.window) / max(request_limit, 1)
+        return min(interval * 2 ** attempt, float(self.window))
+
+    def wait(self, delay):
+        """Waits before a retry and updates the counters.
+
+        :param float delay: The number of seconds to wait.
+        """
+        with self._lock:
+            self._retries += 1
+            self._backoff_time += delay
+        time.sleep(delay)
@@ -0,0 +1,242 @@
+# coding: utf-8
+# libcloud-dnsmadeeasy
+# Copyright (C) 2014 Moses Palmér
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import collections
+import json
+import sqlite3
+
+from libcloud.dns.base import Record, Zone
+
+
+#: The zones changed by :meth:`ZoneStore.sync`
+SyncReport = collections.namedtuple('SyncReport', (
+    'refreshed', 'removed', 'unchanged'))
+
+
+class ZoneStore(object):
+    """A local store of zones and records, kept up to date incrementally.
+
+    Every call to :meth:`sync` lists the zones once, and lists the records of
+    only those zones whose ``updated`` or ``pendingActionId`` values have
+    changed since the previous synchronisation. Queries are answered from the
+    store without sending any requests.
+    """
+    SCHEMA = (
+        '''CREATE TABLE IF NOT EXISTS zones (
+            id TEXT PRIMARY KEY,
+            domain TEXT NOT NULL,
+            updated INTEGER,
+            pending_action_id INTEGER,
+            extra TEXT NOT NULL)''',
+        '''CREATE TABLE IF NOT EXISTS records (
+            id TEXT PRIMARY KEY,
+            zone_id TEXT NOT NULL REFERENCES zones (id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            value TEXT NOT NULL,
+            extra TEXT NOT NULL)''',
+        '''CREATE INDEX IF NOT EXISTS records_zone_id
+            ON records (zone_id)''',
+        '''CREATE INDEX IF NOT EXISTS records_name_type
+            ON records (name, type)''',
+        '''CREATE INDEX IF NOT EXISTS records_type
+            ON records (type)''',
+        '''CREATE INDEX IF NOT EXISTS records_value
+            ON records (value)''')
+
+    def __init__(self, driver, path = ':memory:'):
+        """Creates a zone store.
+
+        :param DNSMadeEasyDNSDriver driver: The driver used to synchronise the
+            store, and to which returned zones and records belong.
+
+        :param str path: The path of the SQLite database. The database is
+            created if it does not exist.
+        """
+        self._driver = driver
+        self._connection = sqlite3.connect(path)
+        with self._connection as connection:
+            connection.execute('PRAGMA foreign_keys = ON')
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+
+    def close(self):
+        """Closes the database.
+        """
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _to_zone(self, row):
+        """Converts a row of the ``zones`` table to a ``Zone`` instance.
+
+        :param tuple row: The values of the columns ``id``, ``domain`` and
+            ``extra``.
+
+        :rtype: libcloud.dns.base.Zone
+        """
+        zone_id, domain, extra = row
+        return Zone(
+            id = zone_id,
+            domain = domain,
+            type = 'master',
+            ttl = None,
+            driver = self._driver,
+            extra = json.loads(extra))
+
+    def _store_zone(self, connection, zone):
+        """Replaces a zone and all its records in the store.
+
+        The records are listed using the driver.
+
+        :param sqlite3.Connection connection: The connection in a transaction.
+
+        :param libcloud.dns.base.Zone zone: The zone.
+        """
+        connection.execute('DELETE FROM records WHERE zone_id = ?',
+            (zone.id,))
+        connection.execute(
+            'INSERT OR REPLACE INTO zones VALUES (?, ?, ?, ?, ?)', (
+                zone.id,
+                zone.domain,
+                zone.extra.get('updated'),
+                zone.extra.get('pendingActionId'),
+                json.dumps(zone.extra)))
+        connection.executemany(
+            'INSERT INTO records VALUES (?, ?, ?, ?, ?, ?)', (
+                (
+                    record.id,
+                    zone.id,
+                    record.name or '',
+                    record.type,
+                    record.data,
+                    json.dumps(record.extra))
+                for record in self._driver.iterate_records(zone)))
+
+    def sync(self):
+        """Synchronises the store with the API.
+
+        :return: the IDs of the zones whose records were listed, the IDs of the
+            zones that no longer exist and the IDs of the unchanged zones
+        :rtype: SyncReport
+        """
+        stored = {
+            zone_id: (updated, pending_action_id)
+            for zone_id, updated, pending_action_id in self._connection.execute(
+                'SELECT id, updated, pending_action_id FROM zones')}
+
+        refreshed = []
+        unchanged = []
+        for zone in self._driver.iterate_zones():
+            state = (
+                zone.extra.get('updated'),
+                zone.extra.get('pendingActionId'))
+            if stored.pop(zone.id, None) == state:
+                unchanged.append(zone.id)
+                continue
+
+            with self._connection as connection:
+                self._store_zone(connection, zone)
+            refreshed.append(zone.id)
+
+        removed = list(stored)
+        with self._connection as connection:
+            connection.executemany('DELETE FROM zones WHERE id = ?',
+                ((zone_id,) for zone_id in removed))
+
+        return SyncReport(refreshed, removed, unchanged)
+
+    def list_zones(self):
+        """Lists all zones in the store.
+
+        :rtype: [libcloud.dns.base.Zone]
+        """
+        return [
+            self._to_zone(row)
+            for row in self._connection.execute(
+                'SELECT id, domain, extra FROM zones ORDER BY domain')]
+
+    def get_zone(self, domain):
+        """Returns the zone for a domain from the store.
+
+        :param str domain: The domain name.
+
+        :return: the zone, or ``None`` if it is not stored
+        :rtype: libcloud.dns.base.Zone or None
+        """
+        row = self._connection.execute(
+            'SELECT id, domain, extra FROM zones WHERE domain = ?',
+            (domain,)).fetchone()
+        return self._to_zone(row) if row is not None else None
+
+    def find_records(self, zone = None, name = None, type = None,
+            data = None):
+        """Finds records in the store.
+
+        Every argument that is not ``None`` must match.
+
+        :param zone: The zone to which the records belong.
+        :type zone: libcloud.dns.base.Zone or None
+
+        :param str name: The partial record name. The zone apex has the name
+            ``''``.
+
+        :param str type: The record type.
+
+        :param str data: The record value.
+
+        :return: the matching records
+        :rtype: [libcloud.dns.base.Record]
+        """
+        conditions = []
+        arguments = []
+        for column, value in (
+                ('zone_id', zone.id if zone is not None else None),
+                ('name', name),
+                ('type', type),
+                ('value', data)):
+            if value is not None:
+                conditions.append('records.%s = ?' % column)
+                arguments.append(value)
+
+        zones = {}
+        records = []
+        for row in self._connection.execute(
+                'SELECT records.id, records.name, records.type, '
+                'records.value, records.extra, '
+                'zones.id, zones.domain, zones.extra '
+                'FROM records JOIN zones ON records.zone_id = zones.id' + (
+                    ' WHERE ' + ' AND '.join(conditions)
+                    if conditions else ''),
+                arguments):
+            record_id, record_name, record_type, value, extra = row[:5]
+            zone_id = row[5]
+            if not zone_id in zones:
+                zones[zone_id] = zone or self._to_zone(row[5:])
+            records.append(Record(
+                id = record_id,
+                name = record_name or None,
+                type = record_type,
+                data = value,
+                zone = zones[zone_id],
+                driver = self._driver,
+                extra = json.loads(extra)))
+
+        return records
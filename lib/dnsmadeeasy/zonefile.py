@@ -0,0 +1,267 @@
+# coding: utf-8
+# libcloud-dnsmadeeasy
+# Copyright (C) 2014 Moses Palmér
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import collections
+import re
+
+
+#: Matches the tokens of a line in a master file; unterminated quoted strings
+#: are matched by the group ``error``
+TOKEN_RE = re.compile(
+    r'"(?:[^"\\]|\\.)*"|[()]|;.*|[^\s"();]+|(?P<error>")')
+
+#: Matches TTL values, optionally using units as in ``1h30m``
+TTL_RE = re.compile(r'^(?:\d+[smhdw]?)+$', re.IGNORECASE)
+
+#: Matches the components of a TTL value
+TTL_COMPONENT_RE = re.compile(r'(\d+)([smhdw]?)', re.IGNORECASE)
+
+#: The number of seconds per TTL unit
+TTL_UNITS = {
+    '': 1,
+    's': 1,
+    'm': 60,
+    'h': 60 * 60,
+    'd': 24 * 60 * 60,
+    'w': 7 * 24 * 60 * 60}
+
+#: Matches escape sequences in character strings
+ESCAPE_RE = re.compile(r'\\(\d{3}|.)')
+
+#: The record classes that may appear in a master file
+CLASSES = frozenset(('IN', 'CS', 'CH', 'HS'))
+
+#: A resource record read from a master file; ``name`` is the owner name
+#: relative to the domain, ``''`` for the apex, ``ttl`` is ``None`` if neither
+#: the record nor a ``$TTL`` directive specifies one, and ``origin`` is the
+#: origin used to resolve relative names in ``rdata``
+Entry = collections.namedtuple('Entry', (
+    'line', 'name', 'ttl', 'type', 'rdata', 'origin'))
+
+
+class ZoneFileError(ValueError):
+    def __init__(self, message, line):
+        """An error in a master file.
+
+        :param str message: A description of the error.
+
+        :param int line: The line number at which the erroneous entry starts.
+        """
+        super(ZoneFileError, self).__init__('line %d: %s' % (line, message))
+        self.line = line
+
+
+def parse_ttl(value):
+    """Parses a TTL value.
+
+    :param str value: The value, either a number of seconds or a value using
+        units, such as ``1h30m``.
+
+    :return: the number of seconds, or ``None`` if ``value`` is not a TTL
+    :rtype: int or None
+    """
+    if not TTL_RE.match(value):
+        return None
+    return sum(
+        int(count) * TTL_UNITS[unit.lower()]
+        for count, unit in TTL_COMPONENT_RE.findall(value))
+
+
+def absolute_name(name, origin):
+    """Resolves a name in a master file.
+
+    :param str name: The name. This is either ``'@'``, an absolute name ending
+        with ``'.'`` or a name relative to ``origin``.
+
+    :param str origin: The current origin, without a trailing ``'.'``.
+
+    :return: the fully qualified name, without a trailing ``'.'``
+    :rtype: str
+    """
+    if name == '@':
+        return origin
+    elif name.endswith('.'):
+        return name[:-1]
+    else:
+        return '%s.%s' % (name, origin)
+
+
+def relative_name(name, domain):
+    """Converts a fully qualified name to a name relative to a domain.
+
+    :param str name: The fully qualified name, without a trailing ``'.'``.
+
+    :param str domain: The domain name.
+
+    :return: the relative name, or ``''`` for the domain itself, or ``None``
+        if ``name`` is not in ``domain``
+    :rtype: str or None
+    """
+    if name.lower() == domain.lower():
+        return ''
+    elif name.lower().endswith('.' + domain.lower()):
+        return name[:-len(domain) - 1]
+    else:
+        return None
+
+
+def quote(text):
+    """Quotes a character string.
+
+    :param str text: The text to quote.
+
+    :return: the text in double quotes, with quotes and backslashes escaped
+    :rtype: str
+    """
+    return '"%s"' % text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def unquote(token):
+    """Reads a character string.
+
+    :param str token: The token as read from a master file, either in double
+        quotes or not.
+
+    :return: the text, without quotes and with escape sequences replaced
+    :rtype: str
+    """
+    if len(token) >= 2 and token[0] == '"' and token[-1] == '"':
+        token = token[1:-1]
+    return ESCAPE_RE.sub(
+        lambda m: chr(int(m.group(1))) if m.group(1).isdigit() else m.group(1),
+        token)
+
+
+def format_entry(name, ttl, type, rdata):
+    """Formats a resource record as a line of a master file.
+
+    :param str name: The owner name relative to the origin, or ``''`` for the
+        origin itself.
+
+    :param ttl: The TTL of the record.
+    :type ttl: int or None
+
+    :param str type: The record type.
+
+    :param str rdata: The formatted record data.
+
+    :return: the line, including the line terminator
+    :rtype: str
+    """
+    if ttl is None:
+        return '%s IN %s %s\n' % (name or '@', type, rdata)
+    else:
+        return '%s %d IN %s %s\n' % (name or '@', ttl, type, rdata)
+
+
+def _logical_lines(fileobj):
+    """Yields the tokens of the logical lines of a master file.
+
+    Comments are removed, and lines continued with parentheses are joined.
+
+    :param fileobj: The file to read. Lines may be ``str`` or UTF-8 encoded
+        ``bytes``.
+
+    :return: a generator yielding the tuples ``(line number, inherits owner,
+        tokens)``, where *inherits owner* is ``True`` if the line starts with
+        whitespace
+    """
+    tokens = []
+    depth = 0
+    start = 0
+    inherits_owner = False
+    for number, line in enumerate(fileobj, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if depth == 0:
+            start = number
+            inherits_owner = line[:1] in (' ', '\t')
+
+        for m in TOKEN_RE.finditer(line):
+            token = m.group(0)
+            if m.group('error'):
+                raise ZoneFileError('unterminated quoted string', number)
+            elif token[0] == ';':
+                break
+            elif token == '(':
+                depth += 1
+            elif token == ')':
+                depth -= 1
+                if depth < 0:
+                    raise ZoneFileError('unbalanced parentheses', number)
+            else:
+                tokens.append(token)
+
+        if depth == 0 and tokens:
+            yield start, inherits_owner, tokens
+            tokens = []
+
+    if depth:
+        raise ZoneFileError('unbalanced parentheses', start)
+
+
+def read(fileobj, domain):
+    """Reads the resource records of a master file as described in RFC 1035.
+
+    The file is read incrementally, and records are yielded as soon as they
+    have been read. The directives ``$ORIGIN`` and ``$TTL`` are supported;
+    the initial origin is ``domain``.
+
+    :param fileobj: The file to read.
+
+    :param str domain: The domain name of the zone. All owner names must be
+        in this domain.
+
+    :return: a generator yielding :class:`Entry` instances
+
+    :raises ZoneFileError: if the file is invalid
+    """
+    origin = domain
+    default_ttl = None
+    owner = None
+    for line, inherits_owner, tokens in _logical_lines(fileobj):
+        directive = tokens[0].upper()
+        if not inherits_owner and directive.startswith('$'):
+            if directive == '$ORIGIN' and len(tokens) == 2:
+                origin = absolute_name(tokens[1], origin)
+            elif directive == '$TTL' and len(tokens) == 2 \
+                    and parse_ttl(tokens[1]) is not None:
+                default_ttl = parse_ttl(tokens[1])
+            elif directive in ('$ORIGIN', '$TTL'):
+                raise ZoneFileError('invalid %s directive' % directive, line)
+            else:
+                raise ZoneFileError(
+                    'unsupported directive %s' % directive, line)
+            continue
+
+        if not inherits_owner:
+            owner = relative_name(absolute_name(tokens.pop(0), origin), domain)
+            if owner is None:
+                raise ZoneFileError('name not in %s' % domain, line)
+        elif owner is None:
+            raise ZoneFileError('no previous owner name', line)
+
+        ttl = default_ttl
+        for i in range(2):
+            if tokens and parse_ttl(tokens[0]) is not None:
+                ttl = parse_ttl(tokens.pop(0))
+            elif tokens and tokens[0].upper() in CLASSES:
+                if tokens.pop(0).upper() != 'IN':
+                    raise ZoneFileError('unsupported class', line)
+        if not tokens:
+            raise ZoneFileError('missing record type', line)
+
+        yield Entry(line, owner, ttl, tokens[0].upper(), tokens[1:], origin)
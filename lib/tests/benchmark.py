@@ -0,0 +1,254 @@
+"""
+Benchmarks for the hot paths of the driver.
+
+The network benchmarks are run against the stub server, and the results are
+written as JSON to allow comparing runs.
+"""
+
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from dnsmadeeasy.api import Headers
+from dnsmadeeasy.driver import DNSMadeEasyDNSDriver
+
+from . import printf
+from .stub import StubServer
+
+API_KEY = 'benchmark-api-key'
+API_SECRET = 'benchmark-api-secret'
+
+"""
+The default numbers of records in the benchmarked zones.
+"""
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+
+"""
+The default number of times to repeat every benchmark.
+"""
+DEFAULT_REPEAT = 3
+
+
+class Benchmark(object):
+    """
+    A benchmark run against a stub server.
+    """
+    def __init__(self, server, repeat):
+        """
+        Creates a benchmark.
+
+        @param server
+            The stub server to use.
+        @param repeat
+            The number of times to repeat every benchmark.
+        """
+        self.server = server
+        self.repeat = repeat
+        self.results = {}
+
+    def driver(self, **kwargs):
+        """
+        Creates a driver for the stub server.
+        """
+        return DNSMadeEasyDNSDriver(API_KEY, API_SECRET,
+            entry_point = self.server.url, **kwargs)
+
+    def populate(self, size):
+        """
+        Creates a zone with a number of A records directly in the stub server.
+
+        @param size
+            The number of records.
+        @return the zone ID
+        """
+        state = self.server.state
+        with state.lock:
+            zone = state.add_zone('size%d.example.com' % size)
+            for i in range(size):
+                state.add_record(zone, {
+                    'name': 'host%d' % i,
+                    'type': 'A',
+                    'value': '10.%d.%d.%d' % (
+                        (i >> 16) & 255, (i >> 8) & 255, i & 255),
+                    'ttl': 3600})
+        return str(zone['id'])
+
+    def measure(self, name, size, func, setup = lambda: None):
+        """
+        Measures a function and stores the result.
+
+        The function is called once under tracemalloc to measure the peak
+        memory usage, and then the number of times to repeat to measure the
+        time.
+
+        @param name
+            The name of the benchmark.
+        @param size
+            The size of the benchmarked data.
+        @param func
+            The function to measure. It is passed the value returned by setup.
+        @param setup
+            A function called before every call to func, which is not timed.
+        """
+        server = self.server
+        requests = server.requests
+        connections = server.connections
+
+        tracemalloc.start()
+        try:
+            func(setup())
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        durations = []
+        for i in range(self.repeat):
+            argument = setup()
+            start = time.perf_counter()
+            func(argument)
+            durations.append(time.perf_counter() - start)
+
+        result = {
+            'seconds': min(durations),
+            'mean': sum(durations) / len(durations),
+            'repeat': len(durations),
+            'peak_memory': peak_memory,
+            'requests': server.requests - requests,
+            'connections': server.connections - connections}
+        self.results.setdefault(name, {})[str(size)] = result
+
+        printf('%-24s %8d %12.6f s %12d B %6d req %6d conn',
+            name, size, result['seconds'], peak_memory,
+            result['requests'], result['connections'])
+
+    def run(self, sizes):
+        """
+        Runs all benchmarks.
+
+        @param sizes
+            The numbers of records in the benchmarked zones.
+        """
+        driver = self.driver()
+        lazy_driver = self.driver(lazy_records = True)
+        zones = dict(
+            (size, driver.get_zone(self.populate(size)))
+            for size in sizes)
+
+        # Connection handling
+        zone = zones[sizes[0]]
+        self.measure('get_zone', 10,
+            lambda _: [driver.get_zone(zone.id) for i in range(10)])
+        self.measure('get_zone_unpooled', 10,
+            lambda _: [self.driver().get_zone(zone.id) for i in range(10)])
+        self.measure('list_zones', len(zones),
+            lambda _: driver.list_zones())
+
+        # Pure CPU paths
+        headers = Headers(API_KEY, API_SECRET)
+        self.measure('Headers.items', 10000,
+            lambda _: [headers.items() for i in range(10000)])
+        zone_items = [dict(z.extra, id = int(z.id), name = z.domain)
+            for z in zones.values()]
+        self.measure('_to_zone', len(zone_items),
+            lambda _: [driver._to_zone(item) for item in zone_items])
+
+        for size in sizes:
+            zone = zones[size]
+            items = driver._list_record_items(zone)
+            record_id = str(items[len(items) // 2]['id'])
+
+            self.measure('_to_record', size,
+                lambda _: [driver._to_record(item, zone) for item in items])
+            self.measure('_to_records', size,
+                lambda _: driver._to_records(items, zone))
+            self.measure('_to_records_lazy', size,
+                lambda _: lazy_driver._to_records(items, zone))
+            self.measure('list_records', size,
+                lambda _: driver.list_records(zone))
+            self.measure('snapshot_records', size,
+                lambda _: driver.snapshot_records(zone))
+            self.measure('get_record', size,
+                lambda _: driver.get_record(zone, record_id))
+
+            counter = iter(range(sys.maxsize))
+            created = []
+            self.measure('create_record', size,
+                lambda _: created.append(driver.create_record(
+                    'new%d' % next(counter), zone, 'A', '1.1.1.1')))
+            driver.delete_records(created)
+            self.measure('delete_record', size,
+                lambda record: driver.delete_record(record),
+                lambda: driver.create_record(
+                    'new%d' % next(counter), zone, 'A', '1.1.1.1'))
+
+        lazy_driver.close()
+        driver.close()
+        return self.results
+
+
+def compare(previous, current):
+    """
+    Prints the relative change of every benchmark.
+
+    @param previous, current
+        The results to compare, as returned by run.
+    """
+    for name, sizes in sorted(current['benchmarks'].items()):
+        for size, result in sorted(sizes.items(), key = lambda i: int(i[0])):
+            try:
+                old = previous['benchmarks'][name][size]
+            except KeyError:
+                continue
+            printf('%-24s %8s %+8.1f%% time %+8.1f%% memory',
+                name, size,
+                100.0 * (result['seconds'] / old['seconds'] - 1.0)
+                    if old['seconds'] else 0.0,
+                100.0 * (result['peak_memory'] / float(old['peak_memory'])
+                    - 1.0) if old['peak_memory'] else 0.0)
+
+
+def run(sizes = DEFAULT_SIZES, repeat = DEFAULT_REPEAT, output = None,
+        previous = None, latency = 0.0):
+    """
+    Runs the benchmarks against a new stub server.
+
+    @param sizes
+        The numbers of records in the benchmarked zones.
+    @param repeat
+        The number of times to repeat every benchmark.
+    @param output
+        The name of a file to which to write the results as JSON. If this is
+        None, the results are only printed.
+    @param previous
+        The name of a file containing results of a previous run to compare
+        with.
+    @param latency
+        The latency of the stub server, in seconds.
+    @return the results
+    """
+    with StubServer(API_KEY, API_SECRET, latency = latency,
+            request_limit = sys.maxsize) as server:
+        benchmarks = Benchmark(server, repeat).run(sorted(sizes))
+
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+        'repeat': repeat,
+        'latency': latency,
+        'benchmarks': benchmarks}
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent = 2, sort_keys = True)
+
+    if previous:
+        printf('')
+        printf('Compared with %s:', previous)
+        with open(previous) as f:
+            compare(json.load(f), results)
+
+    return results
+
@@ -0,0 +1,572 @@
+"""
+An in-process stub of the DNSMadeEasy V2.0 API.
+
+Only the parts of the API used by the driver are implemented.
+"""
+
+import hashlib
+import hmac
+import json
+import re
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlparse, parse_qs
+
+
+def record_key(record):
+    """
+    Returns the tuple (name, type, value) identifying a record.
+
+    @param record
+        The record.
+    """
+    return (record.get('name'), record.get('type'), record.get('value'))
+
+
+class StubError(Exception):
+    """
+    Raised by request handlers to send an error response.
+    """
+    def __init__(self, status, *errors):
+        super(StubError, self).__init__(status, errors)
+        self.status = status
+        self.errors = errors
+
+
+class State(object):
+    """
+    The zones and records known by the stub.
+    """
+    def __init__(self, pending_delay):
+        """
+        Creates an empty state.
+
+        @param pending_delay
+            The number of seconds during which deleted zones remain with a
+            pending action.
+        """
+        self.pending_delay = pending_delay
+        self.zones = {}
+        self.records = {}
+        self.keys = {}
+        self.deleted = {}
+        self.next_id = 1000
+        self.lock = threading.RLock()
+
+    def allocate_id(self):
+        """
+        Returns a new unique ID.
+        """
+        self.next_id += 1
+        return self.next_id
+
+    def expire(self):
+        """
+        Removes zones whose deletion is no longer pending.
+        """
+        now = time.time()
+        for zone_id, deleted in list(self.deleted.items()):
+            if deleted <= now:
+                del self.deleted[zone_id]
+                self.zones.pop(zone_id, None)
+                self.records.pop(zone_id, None)
+                self.keys.pop(zone_id, None)
+
+    def zone(self, zone_id):
+        """
+        Returns a zone.
+
+        @param zone_id
+            The zone ID, as a string.
+        @raise StubError if the zone does not exist
+        """
+        try:
+            return self.zones[int(zone_id)]
+        except (KeyError, ValueError):
+            raise StubError(404, 'Not found')
+
+    def touch(self, zone):
+        """
+        Marks a zone as updated.
+
+        The timestamp is always increased, even for several updates within a
+        millisecond.
+
+        @param zone
+            The zone to mark.
+        """
+        zone['updated'] = max(
+            int(time.time() * 1000),
+            zone['updated'] + 1)
+
+    def add_zone(self, name):
+        """
+        Adds a zone.
+
+        @param name
+            The domain name.
+        @return the zone
+        @raise StubError if the zone already exists
+        """
+        if any(zone['name'] == name for zone in self.zones.values()):
+            raise StubError(400, 'DE1 - Domain %s already exists' % name)
+
+        now = int(time.time() * 1000)
+        zone = {
+            'id': self.allocate_id(),
+            'name': name,
+            'pendingActionId': 0,
+            'created': now,
+            'updated': now}
+        self.zones[zone['id']] = zone
+        self.records[zone['id']] = {}
+        self.keys[zone['id']] = set()
+        return zone
+
+    def remove_zone(self, zone):
+        """
+        Schedules the deletion of a zone.
+
+        The zone remains with a pending action for the pending delay.
+
+        @param zone
+            The zone.
+        @raise StubError if the zone already has a pending action
+        """
+        if zone['pendingActionId']:
+            raise StubError(400, 'DE3 - Domain has a pending action')
+        zone['pendingActionId'] = 1
+        self.deleted[zone['id']] = time.time() + self.pending_delay
+
+    def add_record(self, zone, item):
+        """
+        Adds a record to a zone.
+
+        @param zone
+            The zone.
+        @param item
+            The record request item.
+        @return the record
+        @raise StubError if the record already exists
+        """
+        key = record_key(item)
+        keys = self.keys[zone['id']]
+        if key in keys:
+            raise StubError(400,
+                'Record with this type (%s), name (%s), and value (%s) '
+                'already exists.' % (key[1], key[0], key[2]))
+
+        record = dict(item)
+        record['id'] = self.allocate_id()
+        record.setdefault('ttl', 1800)
+        record.setdefault('source', 1)
+        record.setdefault('gtdLocation', 'DEFAULT')
+        record['sourceId'] = zone['id']
+        self.records[zone['id']][record['id']] = record
+        keys.add(key)
+        self.touch(zone)
+        return record
+
+    def remove_record(self, zone, record_id):
+        """
+        Removes a record from a zone.
+
+        @param zone
+            The zone.
+        @param record_id
+            The record ID.
+        @raise KeyError if the record does not exist
+        """
+        record = self.records[zone['id']].pop(record_id)
+        self.keys[zone['id']].discard(
+            record_key(record))
+        self.touch(zone)
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    The request handler for the stub server.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    # Headers and body are written separately, so Nagle's algorithm would
+    # delay every response on kept-alive connections
+    disable_nagle_algorithm = True
+
+    #: The routes, as tuples (method, path regular expression, handler name)
+    ROUTES = [
+        ('GET', r'/dns/managed/?$', 'list_zones'),
+        ('POST', r'/dns/managed/?$', 'create_zones'),
+        ('DELETE', r'/dns/managed/?$', 'delete_zones'),
+        ('GET', r'/dns/managed/id/([^/]+)/?$', 'get_zone_by_domain'),
+        ('GET', r'/dns/managed/([^/]+)/?$', 'get_zone'),
+        ('DELETE', r'/dns/managed/([^/]+)/?$', 'delete_zone'),
+        ('GET', r'/dns/managed/([^/]+)/records/?$', 'list_records'),
+        ('POST', r'/dns/managed/([^/]+)/records/?$', 'create_record'),
+        ('POST', r'/dns/managed/([^/]+)/records/createMulti/?$',
+            'create_records'),
+        ('PUT', r'/dns/managed/([^/]+)/records/updateMulti/?$',
+            'update_records'),
+        ('DELETE', r'/dns/managed/([^/]+)/records/?$', 'delete_records'),
+        ('DELETE', r'/dns/managed/([^/]+)/records/([^/]+)/?$',
+            'delete_record')]
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def do_PUT(self):
+        self.handle_request('PUT')
+
+    def do_DELETE(self):
+        self.handle_request('DELETE')
+
+    def handle_request(self, method):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0) or 0)
+        body = self.rfile.read(length) if length else b''
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        url = urlparse(self.path)
+        self.query = parse_qs(url.query)
+        headers = {}
+        try:
+            self.authenticate()
+            allowed, limit_headers = server.consume_request()
+            headers.update(limit_headers)
+            if not allowed:
+                raise StubError(400, 'Rate limit exceeded')
+            failure = server.next_failure()
+            if failure is not None and not failure[1]:
+                raise StubError(failure[0], 'Internal server error')
+            data = json.loads(body.decode('utf-8')) if body else None
+            for m, pattern, name in self.ROUTES:
+                match = re.match(pattern, url.path)
+                if m == method and match:
+                    with server.state.lock:
+                        server.state.expire()
+                        status, result = getattr(self, name)(
+                            data, *match.groups())
+                    break
+            else:
+                raise StubError(404, 'Not found')
+            if failure is not None:
+                raise StubError(failure[0], 'Internal server error')
+
+        except StubError as e:
+            status, result = e.status, {'error': list(e.errors)}
+
+        content = json.dumps(result).encode('utf-8') \
+            if result is not None \
+            else b''
+        if method == 'GET' and status == 200:
+            etag = '"%s"' % hashlib.sha1(content).hexdigest()
+            headers['ETag'] = etag
+            if server.etags \
+                    and self.headers.get('If-None-Match') == etag:
+                status, content = 304, b''
+
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def authenticate(self):
+        """
+        Verifies the authentication headers.
+
+        @raise StubError if the headers are invalid
+        """
+        api_key = self.headers.get('x-dnsme-apiKey')
+        date = self.headers.get('x-dnsme-requestDate', '')
+        digest = self.headers.get('x-dnsme-hmac', '')
+        expected = hmac.new(
+            self.server.api_secret.encode(),
+            date.encode(),
+            hashlib.sha1).hexdigest()
+        if api_key != self.server.api_key or digest != expected:
+            raise StubError(403, 'Invalid API key or HMAC')
+
+    def page(self, items):
+        """
+        Creates a paginated listing response.
+
+        @param items
+            All items of the listing.
+        """
+        rows = int(self.query.get('rows', [self.server.rows or 0])[0]) \
+            or len(items) or 1
+        page = int(self.query.get('page', [0])[0])
+        return 200, {
+            'data': items[page * rows:(page + 1) * rows],
+            'page': page,
+            'totalPages': max(1, (len(items) + rows - 1) // rows),
+            'totalRecords': len(items)}
+
+    def list_zones(self, data):
+        state = self.server.state
+        return self.page(sorted(
+            (dict(zone) for zone in state.zones.values()),
+            key = lambda zone: zone['id']))
+
+    def create_zones(self, data):
+        state = self.server.state
+        names = data.get('names', [])
+        existing = set(zone['name'] for zone in state.zones.values())
+        errors = [
+            'DE1 - Domain %s already exists' % name
+                if self.server.named_errors
+                else 'DE1 - Domain already exists'
+            for name in names
+            if name in existing]
+        if errors:
+            raise StubError(400, *errors)
+
+        # Several zones are reported only by their IDs, so that clients must
+        # not rely on receiving the zone objects
+        zones = [dict(state.add_zone(name)) for name in names]
+        return 201, zones[0] if len(zones) == 1 \
+            else [zone['id'] for zone in zones]
+
+    def get_zone(self, data, zone_id):
+        return 200, dict(self.server.state.zone(zone_id))
+
+    def get_zone_by_domain(self, data, domain):
+        for zone in self.server.state.zones.values():
+            if zone['name'] == domain:
+                return 200, dict(zone)
+        raise StubError(404, 'Not found')
+
+    def delete_zone(self, data, zone_id):
+        state = self.server.state
+        state.remove_zone(state.zone(zone_id))
+        state.expire()
+        return 200, None
+
+    def delete_zones(self, data):
+        state = self.server.state
+        zones = [state.zone(zone_id) for zone_id in data or []]
+        if any(zone['pendingActionId'] for zone in zones):
+            raise StubError(400, 'DE3 - Domain has a pending action')
+        for zone in zones:
+            state.remove_zone(zone)
+        state.expire()
+        return 200, None
+
+    def list_records(self, data, zone_id):
+        state = self.server.state
+        state.zone(zone_id)
+        records = sorted(
+            (dict(record) for record in state.records[int(zone_id)].values()),
+            key = lambda record: record['id'])
+        for key in ('recordName', 'type'):
+            if key in self.query:
+                value = self.query[key][0]
+                field = 'name' if key == 'recordName' else 'type'
+                records = [record
+                    for record in records
+                    if record[field] == value]
+        return self.page(records)
+
+    def create_record(self, data, zone_id):
+        state = self.server.state
+        zone = state.zone(zone_id)
+        return 201, dict(state.add_record(zone, data))
+
+    def create_records(self, data, zone_id):
+        state = self.server.state
+        zone = state.zone(zone_id)
+        return 201, [dict(state.add_record(zone, item)) for item in data]
+
+    def update_records(self, data, zone_id):
+        state = self.server.state
+        zone = state.zone(zone_id)
+        records = state.records[zone['id']]
+        if any(not item.get('id') in records for item in data):
+            raise StubError(404, 'Not found')
+        keys = state.keys[zone['id']]
+        for item in data:
+            record = records[item['id']]
+            keys.discard(record_key(record))
+            record.update(item)
+            keys.add(record_key(record))
+        state.touch(zone)
+        return 200, None
+
+    def delete_records(self, data, zone_id):
+        state = self.server.state
+        zone = state.zone(zone_id)
+        records = state.records[zone['id']]
+        try:
+            ids = [int(i) for i in self.query.get('ids', [])]
+        except ValueError:
+            raise StubError(404, 'Not found')
+        if any(not i in records for i in ids):
+            raise StubError(404, 'Not found')
+        for i in ids:
+            state.remove_record(zone, i)
+        return 200, None
+
+    def delete_record(self, data, zone_id, record_id):
+        state = self.server.state
+        zone = state.zone(zone_id)
+        try:
+            state.remove_record(zone, int(record_id))
+        except (KeyError, ValueError):
+            raise StubError(404, 'Not found')
+        return 200, None
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """
+    An HTTP server emulating the DNSMadeEasy V2.0 API.
+
+    The server runs in a background thread once started. Use it as a context
+    manager to start and stop it.
+    """
+    daemon_threads = True
+
+    def __init__(self, api_key, api_secret, latency = 0.0, pending_delay = 0.0,
+            request_limit = 150, window = 300, rows = None, etags = True,
+            named_errors = True):
+        """
+        Creates a stub server listening on a free port on localhost.
+
+        @param api_key, api_secret
+            The credentials that clients must use.
+        @param latency
+            The number of seconds to wait before handling every request.
+        @param pending_delay
+            The number of seconds during which deleted zones remain with a
+            pending action.
+        @param request_limit
+            The number of requests allowed per window.
+        @param window
+            The length of the request limit window, in seconds.
+        @param rows
+            The default page size. If this is None, all items are returned
+            unless the client requests paging.
+        @param etags
+            Whether to respond with 304 Not Modified when the ETag sent by
+            the client matches.
+        @param named_errors
+            Whether errors about existing domains when creating several zones
+            name the domains.
+        """
+        HTTPServer.__init__(self, ('127.0.0.1', 0), Handler)
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.latency = latency
+        self.request_limit = request_limit
+        self.window = window
+        self.rows = rows
+        self.etags = etags
+        self.named_errors = named_errors
+        self.state = State(pending_delay)
+
+        #: The number of connections accepted
+        self.connections = 0
+
+        #: The number of requests received
+        self.requests = 0
+
+        #: The failures to respond with, as tuples (status, applied)
+        self.failures = []
+
+        self._window_start = time.time()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        """The URL of the API"""
+        return 'http://%s:%d' % self.server_address
+
+    def consume_request(self):
+        """
+        Counts a request against the request limit.
+
+        @return the tuple (allowed, headers), where allowed is whether the
+            request limit was not exceeded and headers are the rate limit
+            headers to send
+        """
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.window:
+                self._window_start = now
+                self.requests = 0
+            self.requests += 1
+            remaining = max(0, self.request_limit - self.requests)
+            return self.requests <= self.request_limit, {
+                'x-dnsme-requestLimit': str(self.request_limit),
+                'x-dnsme-requestsRemaining': str(remaining)}
+
+    def fail(self, status = 500, count = 1, applied = False):
+        """
+        Makes the server respond to the next requests with an error.
+
+        @param status
+            The status code of the error responses.
+        @param count
+            The number of requests to fail.
+        @param applied
+            Whether the requests are applied before the error is returned.
+        """
+        with self._lock:
+            self.failures.extend([(status, applied)] * count)
+
+    def next_failure(self):
+        """
+        Removes the next failure to respond with.
+
+        @return the tuple (status, applied), or None if the request should
+            not fail
+        """
+        with self._lock:
+            return self.failures.pop(0) if self.failures else None
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.connections += 1
+        ThreadingMixIn.process_request(self, request, client_address)
+
+    def start(self):
+        """
+        Starts serving requests in a background thread.
+        """
+        self._thread = threading.Thread(target = self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops the server and closes its socket.
+        """
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
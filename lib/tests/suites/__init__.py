@@ -19,6 +19,17 @@ RESOURCE_DIR = os.path.join(
     os.path.dirname(__file__),
     os.path.pardir,
     'resources')
+
+"""
+The URL of the API used by the tests; None means the DNSMadeEasy sandbox.
+"""
+ENTRY_POINT = None
+
+"""
+The stub server used when no API information is available.
+"""
+STUB = None
+
 try:
     with open(os.path.join(RESOURCE_DIR, 'api-information')) as api_file:
         API_KEY, API_SECRET = iter(l.strip()
@@ -26,13 +37,17 @@ try:
             if l.strip())
 except IOError:
     printf(r'''
-The file %s does not exist. It must be on the following format:
+The file %s does not exist, so the tests are run against a local stub server.
+To run them against the DNSMadeEasy sandbox, create it on the following format:
 API_KEY
 API_SECRET
 
 Empty lines are ignored.''' % (
             os.path.relpath(os.path.join(RESOURCE_DIR, 'api-information'))))
-    sys.exit(1)
+    from ..stub import StubServer
+    API_KEY, API_SECRET = 'stub-api-key', 'stub-api-secret'
+    STUB = StubServer(API_KEY, API_SECRET, request_limit = 1000000).start()
+    ENTRY_POINT = STUB.url
 except ValueError:
     printf(r'''
 The file %s is invalid. It must be on the following format:
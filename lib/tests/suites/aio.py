@@ -0,0 +1,83 @@
+from .. import *
+from . import API_KEY, API_SECRET, ENTRY_POINT
+
+import asyncio
+import functools
+
+from dnsmadeeasy.aio import AsyncDNSMadeEasyDNSDriver
+
+
+def asyncdrivertest(f):
+    """Marks a coroutine function as a test for the asynchronous DNS driver"""
+    @functools.wraps(f)
+    def inner():
+        async def run():
+            async with AsyncDNSMadeEasyDNSDriver(API_KEY, API_SECRET, True,
+                    concurrency = 4, entry_point = ENTRY_POINT) as d:
+                return await f(d)
+        return asyncio.run(run())
+    return test(inner)
+
+
+@asyncdrivertest
+async def AsyncDNSMadeEasyDNSDriver_list_zones(d):
+    """Tests that AsyncDNSMadeEasyDNSDriver.list_zones returns a list"""
+    assert isinstance(await d.list_zones(), list), \
+        'AsyncDNSMadeEasyDNSDriver.list_zones did not return a list'
+
+
+@asyncdrivertest
+async def AsyncDNSMadeEasyDNSDriver_get_zone(d):
+    """Tests that AsyncDNSMadeEasyDNSDriver.get_zone can be called
+    concurrently"""
+    zones = await asyncio.gather(*(
+        d.create_zone('async%02d.com' % i)
+        for i in range(8)))
+    try:
+        results = await asyncio.gather(*(
+            d.get_zone(zone.id)
+            for zone in zones))
+        assert_eq(
+            [zone.domain for zone in results],
+            [zone.domain for zone in zones])
+
+    finally:
+        await asyncio.gather(*(
+            d.delete_zone(zone)
+            for zone in zones))
+
+
+@test
+def AsyncDNSMadeEasyDNSDriver_options():
+    """Tests that AsyncDNSMadeEasyDNSDriver rejects unsupported options and
+    does not provide the synchronous methods"""
+    for name in ('retry', 'cache', 'revalidate'):
+        with assert_exception(TypeError):
+            AsyncDNSMadeEasyDNSDriver(API_KEY, API_SECRET, True,
+                entry_point = ENTRY_POINT, **{name: True})
+
+    d = AsyncDNSMadeEasyDNSDriver(API_KEY, API_SECRET, True,
+        entry_point = ENTRY_POINT)
+    for name in ('find_records', 'snapshot_records', 'reconcile_zone',
+            'export_zone', 'create_zones', 'list_records_many',
+            'wait_for_zone_deletion', 'export_zone_to_bind_format'):
+        assert not hasattr(d, name), \
+            'AsyncDNSMadeEasyDNSDriver.%s exists' % name
+
+
+@asyncdrivertest
+async def AsyncDNSMadeEasyDNSDriver_records(d):
+    """Tests that AsyncDNSMadeEasyDNSDriver creates, gets and deletes
+    records"""
+    zone = await d.create_zone('asyncrecords.com')
+    try:
+        record = await d.create_record('www', zone, 'A', '10.0.0.1')
+        assert_eq(
+            [(r.name, r.data) for r in await d.list_records(zone)],
+            [('www', '10.0.0.1')])
+        assert_eq((await d.get_record(zone.id, record.id)).data, '10.0.0.1')
+        await d.delete_record(record)
+        assert_eq(await d.list_records(zone), [])
+
+    finally:
+        await d.delete_zone(zone)
@@ -1,7 +1,11 @@
 from .. import *
-from . import API_KEY, API_SECRET
+from . import API_KEY, API_SECRET, ENTRY_POINT
 
-from dnsmadeeasy.api import Headers, DNSMadeEasyAPI
+import sys
+import threading
+import time
+
+from dnsmadeeasy.api import Headers, DNSMadeEasyAPI, format_date
 
 
 @test
@@ -23,8 +27,94 @@ def Headers_items1():
 @test
 def DNSMadeEasyAPI_dns_managed():
     """Tests that GET for dns/managed returns valid JSON"""
-    r = DNSMadeEasyAPI(API_KEY, API_SECRET, True).dns.managed.GET()
+    r = DNSMadeEasyAPI(API_KEY, API_SECRET, True,
+        entry_point = ENTRY_POINT).dns.managed.GET()
     assert_eq(
         r.status_code,
         200)
     r.json()
+
+
+@test
+def DNSMadeEasyAPI_pool():
+    """Tests that DNSMadeEasyAPI uses the configured connection pool for all
+    children"""
+    api = DNSMadeEasyAPI(API_KEY, API_SECRET, True, pool_maxsize = 32,
+        entry_point = ENTRY_POINT)
+    adapter = api.dns.managed._session.get_adapter(api._url())
+    assert_eq(
+        adapter._pool_maxsize,
+        32)
+
+
+@test
+def Headers_get_time():
+    """Tests that the timestamp does not depend on the locale"""
+    assert_eq(
+        format_date(784111777),
+        'Sun, 06 Nov 1994 08:49:37 GMT')
+
+
+@test
+def Headers_get_signature():
+    """Tests that the signature matches the timestamp"""
+    headers = Headers(API_KEY, API_SECRET)
+    t, h = headers.get_signature()
+    assert_eq(
+        headers.get_hash(t),
+        h)
+
+
+@test
+def Headers_get_signature_memoised():
+    """Tests that the same signature is returned within one second"""
+    headers = Headers(API_KEY, API_SECRET)
+    while True:
+        second = int(time.time())
+        signature1 = headers.get_signature()
+        signature2 = headers.get_signature()
+        if int(time.time()) == second:
+            break
+    assert signature1 is signature2, \
+        'The signature was calculated twice in one second'
+
+
+@test
+def Headers_get_signature_concurrent():
+    """Tests that concurrent callers share one signature per second"""
+    class CountingHeaders(Headers):
+        def get_hash(self, t):
+            hashes.append(t)
+            time.sleep(0.01)
+            return super(CountingHeaders, self).get_hash(t)
+
+    hashes = []
+    results = []
+    headers = CountingHeaders(API_KEY, API_SECRET)
+
+    def worker():
+        for i in range(50):
+            results.append(headers.get_signature())
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target = worker) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    signatures = {}
+    for signature in results:
+        assert signatures.setdefault(signature[0], signature) is signature, \
+            'Different signatures were returned for one second'
+    assert_eq(
+        sorted(hashes),
+        sorted(signatures))
+
+    expected = Headers(API_KEY, API_SECRET)
+    for t, h in signatures.values():
+        assert_eq(expected.get_hash(t), h)
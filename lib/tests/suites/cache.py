@@ -0,0 +1,65 @@
+from .. import *
+from .driver import create_driver, domain_names
+
+import json
+import time
+
+from dnsmadeeasy.cache import MemoryCache
+
+
+@test
+def MemoryCache_get0():
+    """Tests that MemoryCache.get fails for uncached keys"""
+    with assert_exception(KeyError):
+        MemoryCache().get(('zone', '1'))
+
+
+@test
+def MemoryCache_get1():
+    """Tests that MemoryCache.get fails for expired keys"""
+    cache = MemoryCache()
+    cache.set(('zone', '1'), 'value', 0.01)
+    time.sleep(0.02)
+    with assert_exception(KeyError):
+        cache.get(('zone', '1'))
+
+
+@test
+def MemoryCache_set():
+    """Tests that MemoryCache.set evicts the least recently used value"""
+    cache = MemoryCache(2)
+    cache.set(('zone', '1'), 1, 60)
+    cache.set(('zone', '2'), 2, 60)
+    cache.get(('zone', '1'))
+    cache.set(('zone', '3'), 3, 60)
+
+    assert_eq(
+        cache.get(('zone', '1')),
+        1)
+    with assert_exception(KeyError):
+        cache.get(('zone', '2'))
+
+
+@test
+def DNSMadeEasyDNSDriver_cache_serialised():
+    """Tests that DNSMadeEasyDNSDriver works with a cache serialising values
+    as JSON"""
+    class JSONCache(MemoryCache):
+        def get(self, key):
+            return json.loads(super(JSONCache, self).get(key))
+
+        def set(self, key, value, ttl):
+            super(JSONCache, self).set(key, json.dumps(value), ttl)
+
+    d = create_driver(cache = JSONCache())
+    zone = d.create_zone(next(domain_names))
+    d.create_record('www', zone, type = 'A', data = '1.1.1.1')
+
+    for i in range(2):
+        assert_eq(d.get_zone(zone.id).domain, zone.domain)
+        assert zone.domain in [z.domain for z in d.list_zones()], \
+            'The zone was not listed'
+        assert_eq(
+            [(r.name, r.data, r.zone.id) for r in d.list_records(zone)],
+            [('www', '1.1.1.1', zone.id)])
+    assert_eq(d.cache_stats, {'hits': 3, 'misses': 3})
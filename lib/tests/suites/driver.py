@@ -1,10 +1,9 @@
 from .. import *
-from . import API_KEY, API_SECRET
+from . import API_KEY, API_SECRET, ENTRY_POINT, STUB
 
 import functools
 import sys
 import time
-import types
 
 from libcloud.common.types import LibcloudError
 from libcloud.dns.base import Zone
@@ -12,17 +11,24 @@ from libcloud.dns.types import ZoneDoesNotExistError, ZoneAlreadyExistsError
 from libcloud.dns.types import RecordDoesNotExistError, RecordAlreadyExistsError
 from libcloud.dns.providers import get_driver
 
-from dnsmadeeasy.driver import DNSMadeEasyDNSDriver, \
+from dnsmadeeasy.driver import DNSMadeEasyDNSDriver, LazyRecord, \
     DNSMadeEasyRateLimitExceededError
 
+from ..stub import StubServer
+
 Driver = get_driver('dnsmadeeasy')
 
+def create_driver(**kwargs):
+    """Creates a driver for the API used by the tests"""
+    return Driver(API_KEY, API_SECRET, True, entry_point = ENTRY_POINT,
+        **kwargs)
+
 def drivertest(f):
     """Marks a function as a test for the DNS driver"""
     @functools.wraps(f)
     def inner():
         try:
-            return f(Driver(API_KEY, API_SECRET, True))
+            return f(create_driver())
         except DNSMadeEasyRateLimitExceededError as e:
             printf('Rate limit exceeded (0 of %d requests remaining); '
                     'terminating prematuely', e.request_limit)
@@ -45,44 +51,34 @@ domain_names = domain_names()
 def remove_zones():
     """Removes all zones after the test suite has run and waits for them to
     actually be deleted"""
-    driver = Driver(API_KEY, API_SECRET, True)
+    driver = create_driver()
 
     printf('Removing all zones')
 
-    wait_duration = 8
-    while True:
-        remaining = driver.list_zones()
-        needs_update = False
-
-        for zone in remaining:
-            try:
-                # Only touch zones with no pending action
-                if zone.extra.get('pendingActionId', 0) == 0:
-                    driver.delete_zone(zone)
-                    printf('Scheduled dletion of zone %s', zone.domain)
-                    needs_update = True
-
-            except DNSMadeEasyRateLimitExceededError as e:
-                printf('Rate limit exceeded (0 of %d requests remaining); '
-                    'terminating prematuely', e.request_limit)
-                return
+    try:
+        zones = driver.list_zones()
 
-            except LibcloudError as e:
-                printf('Failed to remove zone %s: %s',
-                    zone.domain, str(e.value))
+        # Only touch zones with no pending action
+        driver.delete_zones([
+            zone for zone in zones
+            if zone.extra.get('pendingActionId', 0) == 0])
+        remaining = driver.wait_for_zone_deletion(zones, timeout = 600,
+            interval = 8)
 
-        # Update the list only when needed
-        if needs_update:
-            remaining = driver.list_zones()
+    except DNSMadeEasyRateLimitExceededError as e:
+        printf('Rate limit exceeded (0 of %d requests remaining); '
+            'terminating prematuely', e.request_limit)
+        return
 
-        if remaining:
-            printf('Zones %s remaining, waiting %d seconds...',
-                ', '.join(zone.domain for zone in remaining), wait_duration)
-            time.sleep(wait_duration)
-            if wait_duration < 32:
-                wait_duration *= 2
-        else:
-            return True
+    except LibcloudError as e:
+        printf('Failed to remove zones: %s', str(e.value))
+        return
+
+    if remaining:
+        printf('Zones %s remaining',
+            ', '.join(zone.domain for zone in remaining))
+    else:
+        return True
 
 
 @test
@@ -96,7 +92,7 @@ def DNSMadeEasyDNSDriver_registered():
 @drivertest
 def DNSMadeEasyDNSDriver_list_zones0(d):
     """Tests that DNSMadeEasyDNSDriver.list_zones returns a sequence"""
-    assert isinstance(d.list_zones(), types.ListType), \
+    assert isinstance(d.list_zones(), list), \
         'DNSMadeEasyDNSDriver.list_zones did not return a list'
 
 
@@ -168,7 +164,7 @@ def DNSMadeEasyDNSDriver_list_records0(d):
     domain = next(domain_names)
 
     zone = d.create_zone(domain)
-    assert isinstance(d.list_records(zone), types.ListType), \
+    assert isinstance(d.list_records(zone), list), \
         'DNSMadeEasyDNSDriver.list_records did not return a list'
 
 
@@ -206,6 +202,38 @@ def DNSMadeEasyDNSDriver_get_record2(d):
             getattr(record2, a))
 
 
+@drivertest
+def DNSMadeEasyDNSDriver_get_record4(d):
+    """Tests that DNSMadeEasyDNSDriver keeps no record indexes without an
+    index TTL"""
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    record = d.create_record('subdomain', zone, type = 'A', data = '1.1.1.1')
+    d.list_records(zone)
+    assert_eq(d.get_record(zone, record.id).id, record.id)
+    assert_eq(len(d.find_records(zone, data = '1.1.1.1')), 1)
+    assert_eq(len(d._record_indexes), 0)
+
+
+@test
+def DNSMadeEasyDNSDriver_get_record5():
+    """Tests that DNSMadeEasyDNSDriver keeps at most MAX_INDEXES record
+    indexes"""
+    class BoundedDriver(Driver):
+        MAX_INDEXES = 2
+    d = BoundedDriver(API_KEY, API_SECRET, True, entry_point = ENTRY_POINT,
+        index_ttl = 60)
+
+    zones = [d.create_zone(next(domain_names)) for i in range(3)]
+    for zone in zones:
+        record = d.create_record('www', zone, type = 'A', data = '1.1.1.1')
+        assert_eq(d.get_record(zone, record.id).id, record.id)
+    assert_eq(len(d._record_indexes), 2)
+    assert d._get_index(zones[0].id) is None, \
+        'The least recently used index was kept'
+
+
 @drivertest
 def DNSMadeEasyDNSDriver_Zone_create_record0(d):
     """Tests that DNSMadeEasyDNSDriver.create_record returns a valid record"""
@@ -258,3 +286,540 @@ def DNSMadeEasyDNSDriver_delete_record1(d):
     d.delete_record(record)
     with assert_exception(RecordDoesNotExistError):
         d.delete_record(record)
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_get_record3(d):
+    """Tests that DNSMadeEasyDNSDriver.get_record accepts a zone instead of a
+    zone ID"""
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    record1 = d.create_record('subdomain', zone, type = 'A', data = '1.1.1.1',
+        extra = {'ttl': 1000})
+    record2 = d.get_record(zone, record1.id)
+
+    for a in ('id', 'name', 'type', 'data', 'extra'):
+        assert_eq(
+            getattr(record1, a),
+            getattr(record2, a))
+
+
+@test
+def DNSMadeEasyDNSDriver_iterate_records0():
+    """Tests that DNSMadeEasyDNSDriver.iterate_records returns all records
+    when paging"""
+    d = create_driver(page_size = 2, prefetch = True)
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    for i in range(5):
+        d.create_record('subdomain%d' % i, zone, type = 'A', data = '1.1.1.1',
+            extra = {'ttl': 1000})
+
+    assert_eq(
+        sorted(r.name for r in d.iterate_records(zone)
+            if r.type == 'A'),
+        ['subdomain%d' % i for i in range(5)])
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_create_records0(d):
+    """Tests that DNSMadeEasyDNSDriver.create_records creates all records"""
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    records = d.create_records(zone, [
+        {'name': 'subdomain%d' % i, 'type': 'A', 'data': '1.1.1.1'}
+        for i in range(5)])
+
+    assert_eq(
+        sorted(r.name for r in records),
+        sorted(r.name for r in d.list_records(zone) if r.type == 'A'))
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_create_records1(d):
+    """Tests that DNSMadeEasyDNSDriver.create_records fails when creating an
+    already existing record"""
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    d.create_record('subdomain', zone, type = 'A', data = '1.1.1.1')
+    with assert_exception(RecordAlreadyExistsError):
+        d.create_records(zone, [
+            {'name': 'subdomain', 'type': 'A', 'data': '1.1.1.1'}])
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_update_records0(d):
+    """Tests that DNSMadeEasyDNSDriver.update_records updates all records"""
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    records = d.create_records(zone, [
+        {'name': 'subdomain%d' % i, 'type': 'A', 'data': '1.1.1.1'}
+        for i in range(5)])
+    for record in records:
+        record.data = '2.2.2.2'
+    d.update_records(records)
+
+    assert_eq(
+        set(r.data for r in d.list_records(zone) if r.type == 'A'),
+        set(['2.2.2.2']))
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_delete_records0(d):
+    """Tests that DNSMadeEasyDNSDriver.delete_records deletes all records"""
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    records = d.create_records(zone, [
+        {'name': 'subdomain%d' % i, 'type': 'A', 'data': '1.1.1.1'}
+        for i in range(5)])
+    d.delete_records(records)
+
+    assert_eq(
+        [r for r in d.list_records(zone) if r.type == 'A'],
+        [])
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_update_delete_records_missing(d):
+    """Tests that DNSMadeEasyDNSDriver.update_records and
+    DNSMadeEasyDNSDriver.delete_records report the missing records"""
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    records = d.create_records(zone, [
+        {'name': 'subdomain%d' % i, 'type': 'A', 'data': '1.1.1.1'}
+        for i in range(5)])
+    d.delete_record(records[2])
+
+    for method in (d.update_records, d.delete_records):
+        with assert_exception(RecordDoesNotExistError,
+                lambda e: e.record_id == records[2].id
+                    and e.value == [records[2]]):
+            method(records)
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_list_records_many(d):
+    """Tests that DNSMadeEasyDNSDriver.list_records_many lists the records of
+    all zones"""
+    zones = [d.create_zone(next(domain_names)) for i in range(4)]
+    for zone in zones:
+        d.create_record('subdomain', zone, type = 'A', data = '1.1.1.1')
+
+    result = dict(
+        (zone.id, records)
+        for zone, records in d.list_records_many(zones, max_workers = 2))
+    assert_eq(
+        sorted(result.keys()),
+        sorted(zone.id for zone in zones))
+    for zone in zones:
+        assert any(r.name == 'subdomain' for r in result[zone.id]), \
+            'The records of %s were not listed' % zone.domain
+
+
+@test
+def DNSMadeEasyDNSDriver_cache0():
+    """Tests that DNSMadeEasyDNSDriver caches zone listings"""
+    d = create_driver(cache = True)
+
+    d.list_zones()
+    d.list_zones()
+    assert_eq(
+        d.cache_stats,
+        {'hits': 1, 'misses': 1})
+
+
+@test
+def DNSMadeEasyDNSDriver_cache1():
+    """Tests that DNSMadeEasyDNSDriver invalidates cached records when
+    creating a record"""
+    d = create_driver(cache = True)
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    d.list_records(zone)
+    d.create_record('subdomain', zone, type = 'A', data = '1.1.1.1')
+
+    assert any(r.name == 'subdomain' for r in d.list_records(zone)), \
+        'The newly created record was not included in the record listing'
+
+
+@test
+def DNSMadeEasyDNSDriver_cache2():
+    """Tests that DNSMadeEasyDNSDriver does not cache a value loaded during an
+    invalidation, and keeps no state for keys once loaded"""
+    d = create_driver(cache = True)
+    loads = []
+
+    def load():
+        loads.append(None)
+        if len(loads) == 1:
+            d._invalidate(('records', 'key'))
+        return []
+
+    d._cached('records', 'key', load)
+    d._cached('records', 'key', load)
+    d._cached('records', 'key', load)
+    assert_eq(len(loads), 2)
+
+    domain = next(domain_names)
+    zone = d.create_zone(domain)
+    for i in range(5):
+        d.create_record('subdomain%d' % i, zone, type = 'A', data = '1.1.1.1')
+        d.list_records(zone)
+    assert_eq(d._loads, {})
+
+
+@test
+def DNSMadeEasyDNSDriver_revalidate():
+    """Tests that DNSMadeEasyDNSDriver reuses unchanged listings without
+    sharing records"""
+    d = create_driver(revalidate = True)
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    d.create_record('subdomain', zone, type = 'A', data = '1.1.1.1')
+    records1 = d.list_records(zone)
+    page = next(iter(d._pages._values.values()))[1]
+    records1[0].data = '2.2.2.2'
+    records1[0].extra['ttl'] = 1
+    records2 = d.list_records(zone)
+    assert next(iter(d._pages._values.values()))[1] is page, \
+        'An unchanged page was replaced'
+    assert_eq(
+        [(r.data, r.extra['ttl']) for r in records2],
+        [('1.1.1.1', 3600)])
+
+    d.create_record('subdomain2', zone, type = 'A', data = '1.1.1.1')
+    assert_eq(
+        len(d.list_records(zone)),
+        len(records1) + 1)
+
+
+@test
+def DNSMadeEasyDNSDriver_revalidate_bounded():
+    """Tests that DNSMadeEasyDNSDriver keeps at most MAX_PAGES pages"""
+    class BoundedDriver(Driver):
+        MAX_PAGES = 2
+    d = BoundedDriver(API_KEY, API_SECRET, True, entry_point = ENTRY_POINT,
+        revalidate = True)
+
+    zones = [d.create_zone(next(domain_names)) for i in range(3)]
+    for zone in zones:
+        d.list_records(zone)
+    assert_eq(len(d._pages), 2)
+
+
+@test
+def DNSMadeEasyDNSDriver_lazy_records():
+    """Tests that DNSMadeEasyDNSDriver returns equal lazy and eager records"""
+    d = create_driver(lazy_records = True)
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    d.create_record('subdomain', zone, type = 'MX', data = 'mail.example.com',
+        extra = {'mxLevel': 10})
+    d.create_record('', zone, type = 'A', data = '1.1.1.1')
+
+    key = lambda r: r.id
+    lazy_records = sorted(d.list_records(zone), key = key)
+    eager_records = sorted(create_driver().list_records(zone), key = key)
+    assert_eq(len(lazy_records), len(eager_records))
+    for lazy, eager in zip(lazy_records, eager_records):
+        assert isinstance(lazy, LazyRecord), \
+            'A lazy record was not returned'
+        for a in ('id', 'name', 'type', 'data', 'extra', 'ttl'):
+            assert_eq(getattr(lazy, a), getattr(eager, a))
+
+    record = lazy_records[0]
+    record.data = '2.2.2.2'
+    assert_eq(record.data, '2.2.2.2')
+
+    record.name = 'renamed'
+    assert_eq(record.fqdn, 'renamed.' + domain)
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_snapshot_records(d):
+    """Tests that DNSMadeEasyDNSDriver.snapshot_records contains the same
+    records as DNSMadeEasyDNSDriver.list_records"""
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    d.create_records(zone, [
+        {'name': 'subdomain%d' % i, 'type': 'A', 'data': '1.1.1.1'}
+        for i in range(5)])
+    d.create_record('subdomain0', zone, type = 'MX', data = 'mail.example.com',
+        extra = {'mxLevel': 10})
+
+    key = lambda r: r.id
+    snapshot = d.snapshot_records(zone)
+    records = d.list_records(zone)
+    assert_eq(len(snapshot), len(records))
+    for record1, record2 in zip(
+            sorted(snapshot, key = key), sorted(records, key = key)):
+        for a in ('id', 'name', 'type', 'data', 'extra'):
+            assert_eq(getattr(record1, a), getattr(record2, a))
+
+    assert_eq(
+        [(r.name, r.type) for r in snapshot.select(name = 'subdomain0')
+            if r.type in ('A', 'MX')],
+        [('subdomain0', 'A'), ('subdomain0', 'MX')])
+    assert_eq(
+        [r.data for r in snapshot.select(type = 'MX')],
+        ['mail.example.com'])
+    assert_eq(
+        [r.type for r in snapshot.select(name = 'subdomain0', type = 'MX')],
+        ['MX'])
+    assert_eq(
+        [r.name for r in snapshot.select(type = 'A').select(
+            name = 'subdomain1')],
+        ['subdomain1'])
+    assert_eq(snapshot.indexes(name = 'missing', type = 'A'), [])
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_reconcile_zone(d):
+    """Tests that DNSMadeEasyDNSDriver.reconcile_zone applies the minimal
+    change set"""
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    d.create_records(zone, [
+        {'name': 'unchanged', 'type': 'A', 'data': '1.1.1.1'},
+        {'name': 'value', 'type': 'A', 'data': '1.1.1.1'},
+        {'name': 'ttl', 'type': 'A', 'data': '1.1.1.1'},
+        {'name': 'deleted', 'type': 'A', 'data': '1.1.1.1'}])
+    desired = [
+        {'name': 'unchanged', 'type': 'A', 'data': '1.1.1.1'},
+        {'name': 'value', 'type': 'A', 'data': '2.2.2.2'},
+        {'name': 'ttl', 'type': 'A', 'data': '1.1.1.1',
+            'extra': {'ttl': 1800}},
+        {'name': 'created', 'type': 'A', 'data': '1.1.1.1'}]
+    records = lambda: sorted(
+        (r.name, r.data, r.extra['ttl'])
+        for r in d.list_records(zone)
+        if r.type == 'A')
+
+    before = records()
+    report = d.reconcile_zone(zone, desired, dry_run = True)
+    assert_eq(records(), before)
+
+    report = d.reconcile_zone(zone, desired)
+    assert_eq(
+        [sorted(r.name for r in records) for records in report],
+        [['created'], ['ttl', 'value'], ['deleted'], ['unchanged']])
+    assert_eq(records(), [
+        ('created', '1.1.1.1', 3600),
+        ('ttl', '1.1.1.1', 1800),
+        ('unchanged', '1.1.1.1', 3600),
+        ('value', '2.2.2.2', 3600)])
+
+    report = d.reconcile_zone(zone, desired)
+    assert_eq(
+        [len(records) for records in report[:3]],
+        [0, 0, 0])
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_create_zones(d):
+    """Tests that DNSMadeEasyDNSDriver.create_zones creates all zones and
+    reports existing domains"""
+    existing = d.create_zone(next(domain_names))
+    domains = [next(domain_names) for i in range(5)]
+
+    result = d.create_zones(
+        domains[:2] + [existing.domain] + domains[2:],
+        chunk_size = 3)
+    assert_eq(
+        [zone.domain for zone in result.created],
+        domains)
+    assert_eq(
+        result.existing,
+        [existing.domain])
+    assert all(zone.id for zone in result.created), \
+        'A created zone has no ID'
+    assert_eq(
+        sorted(zone.id for zone in d.list_zones()
+            if zone.domain in domains),
+        sorted(zone.id for zone in result.created))
+
+
+@test
+def DNSMadeEasyDNSDriver_create_zones_unnamed():
+    """Tests that DNSMadeEasyDNSDriver.create_zones finds existing domains
+    when the errors do not name them"""
+    with StubServer('key', 'secret', named_errors = False) as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url)
+        domains = ['example%d.com' % i for i in range(24)]
+        d.create_zone(domains[2])
+        result = d.create_zones(domains[:8])
+        assert_eq(result.existing, [domains[2]])
+
+        d.create_zone(domains[13])
+        requests = server.requests
+        result = d.create_zones(domains[8:])
+        assert_eq(
+            [zone.domain for zone in result.created],
+            [domain for domain in domains[8:] if domain != domains[13]])
+        assert_eq(result.existing, [domains[13]])
+        assert server.requests - requests < 16, \
+            'Too many requests were made'
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_delete_zones(d):
+    """Tests that DNSMadeEasyDNSDriver.delete_zones deletes all zones"""
+    zones = d.create_zones([next(domain_names) for i in range(3)]).created
+    d.delete_zones(zones)
+
+    assert_eq(
+        d.wait_for_zone_deletion(zones, interval = 1),
+        [])
+    assert_eq(
+        [zone for zone in d.list_zones()
+            if zone.id in set(z.id for z in zones)],
+        [])
+
+
+@test
+def DNSMadeEasyDNSDriver_wait_for_zone_deletion0():
+    """Tests that DNSMadeEasyDNSDriver.wait_for_zone_deletion waits for
+    pending deletions with one listing per poll"""
+    with StubServer('key', 'secret', pending_delay = 0.2) as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url)
+        zones = d.create_zones(['example%d.com' % i for i in range(20)]).created
+        d.delete_zones(zones)
+
+        requests = server.requests
+        start = time.time()
+        assert_eq(
+            d.wait_for_zone_deletion(zones, timeout = 5, interval = 0.05),
+            [])
+        assert time.time() - start < 1, \
+            'Waiting took too long'
+        assert server.requests - requests < 10, \
+            'Too many requests were made'
+
+
+@test
+def DNSMadeEasyDNSDriver_wait_for_zone_deletion1():
+    """Tests that DNSMadeEasyDNSDriver.wait_for_zone_deletion returns the
+    remaining zones on timeout"""
+    with StubServer('key', 'secret', pending_delay = 60) as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url)
+        zone = d.create_zone('example.com')
+        d.delete_zones([zone])
+
+        assert_eq(
+            [z.id for z in d.wait_for_zone_deletion([zone], timeout = 0.2,
+                interval = 0.05)],
+            [zone.id])
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_find_records0(d):
+    """Tests that DNSMadeEasyDNSDriver.find_records returns matching records
+    using server side filtering"""
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    d.create_records(zone, [
+        {'name': 'www', 'type': 'A', 'data': '1.1.1.1'},
+        {'name': 'www', 'type': 'A', 'data': '2.2.2.2'},
+        {'name': 'www', 'type': 'AAAA', 'data': '::1'},
+        {'name': 'mail', 'type': 'A', 'data': '1.1.1.1'}])
+
+    assert_eq(
+        sorted(r.data for r in d.find_records(zone, name = 'www', type = 'A')),
+        ['1.1.1.1', '2.2.2.2'])
+    assert_eq(
+        sorted(r.name for r in d.find_records(zone, type = 'A',
+            data = '1.1.1.1')),
+        ['mail', 'www'])
+    assert_eq(
+        d.find_records(zone, name = 'ftp'),
+        [])
+
+
+@test
+def DNSMadeEasyDNSDriver_find_records1():
+    """Tests that DNSMadeEasyDNSDriver.find_records uses a fresh index without
+    contacting the server"""
+    d = create_driver(index_ttl = 60)
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    d.create_record('www', zone, type = 'A', data = '1.1.1.1')
+    d.find_records(zone, name = 'www')
+
+    requests = STUB.requests if STUB else None
+    for i in range(10):
+        assert_eq(
+            [r.data for r in d.find_records(zone, name = 'www', type = 'A')],
+            ['1.1.1.1'])
+    if STUB:
+        assert_eq(STUB.requests, requests)
+
+    record = d.create_record('www', zone, type = 'A', data = '2.2.2.2')
+    assert_eq(
+        sorted(r.data for r in d.find_records(zone, name = 'www')),
+        ['1.1.1.1', '2.2.2.2'])
+    d.delete_record(record)
+    assert_eq(
+        [r.data for r in d.find_records(zone, data = '2.2.2.2')],
+        [])
+
+
+@test
+def DNSMadeEasyDNSDriver_get_zone_by_domain0():
+    """Tests that DNSMadeEasyDNSDriver.get_zone_by_domain returns known zones
+    without contacting the server"""
+    d = create_driver()
+    domain = next(domain_names)
+
+    zone = create_driver().create_zone(domain)
+    d.list_zones()
+    requests = STUB.requests if STUB else None
+    for i in range(5):
+        assert_eq(d.get_zone_by_domain(domain).id, zone.id)
+    if STUB:
+        assert_eq(STUB.requests, requests)
+
+    d.delete_zone(zone)
+    with assert_exception(ZoneDoesNotExistError):
+        d.get_zone_by_domain(domain)
+
+
+@drivertest
+def DNSMadeEasyDNSDriver_get_zone_by_domain1(d):
+    """Tests that DNSMadeEasyDNSDriver.get_zone_by_domain looks up unknown
+    domains"""
+    domain = next(domain_names)
+
+    zone = create_driver().create_zone(domain)
+    assert_eq(d.get_zone_by_domain(domain).id, zone.id)
+    with assert_exception(ZoneDoesNotExistError):
+        d.get_zone_by_domain(next(domain_names))
+
+
+@test
+def DNSMadeEasyDNSDriver_get_zone_by_domain2():
+    """Tests that DNSMadeEasyDNSDriver.get_zone_by_domain looks up domains
+    again once their IDs have expired"""
+    d = create_driver(cache = True, cache_ttl = {'zone': 0})
+    domain = next(domain_names)
+
+    zone = d.create_zone(domain)
+    create_driver().delete_zone(zone)
+    with assert_exception(ZoneDoesNotExistError):
+        d.get_zone_by_domain(domain)
+
+    zone = create_driver().create_zone(domain)
+    assert_eq(d.get_zone_by_domain(domain).id, zone.id)
@@ -0,0 +1,84 @@
+from .. import *
+from .driver import create_driver, domain_names
+
+from dnsmadeeasy.metrics import Histogram, Hook, MetricsAggregator, endpoint
+
+
+@test
+def endpoint_ids():
+    """Tests that endpoint replaces numeric path segments"""
+    assert_eq(
+        endpoint('get', '/dns/managed/1234/records/5678/'),
+        'GET /dns/managed/{id}/records/{id}')
+
+
+@test
+def Histogram_quantile():
+    """Tests that Histogram.quantile returns the bucket upper bound"""
+    histogram = Histogram((1, 2, 4))
+    for value in (0.5, 1.5, 1.5, 3, 10):
+        histogram.add(value)
+
+    assert_eq(
+        histogram.counts,
+        [1, 2, 1, 1])
+    assert_eq(
+        [histogram.quantile(q) for q in (0.2, 0.5, 0.8, 1.0)],
+        [1, 2, 4, 10])
+
+
+@test
+def DNSMadeEasyDNSDriver_hooks():
+    """Tests that DNSMadeEasyDNSDriver calls the instrumentation hooks"""
+    class Recorder(Hook):
+        def __init__(self):
+            self.calls = []
+
+        def before_request(self, method, path):
+            self.calls.append('before_request')
+
+        def after_request(self, event):
+            self.calls.append('after_request')
+
+        def after_decode(self, method, path, seconds):
+            self.calls.append('after_decode')
+
+        def after_convert(self, kind, count, seconds):
+            self.calls.append('after_convert')
+
+    d = create_driver()
+    zone = d.create_zone(next(domain_names))
+
+    recorder = Recorder()
+    d.add_hook(recorder)
+    d.get_zone(zone.id)
+    d.remove_hook(recorder)
+    d.get_zone(zone.id)
+
+    assert_eq(
+        recorder.calls,
+        ['before_request', 'after_request', 'after_decode', 'after_convert'])
+
+
+@test
+def MetricsAggregator_snapshot():
+    """Tests that MetricsAggregator collects metrics per endpoint"""
+    d = create_driver()
+    zone = d.create_zone(next(domain_names))
+    d.create_record('subdomain', zone, type = 'A', data = '1.1.1.1')
+
+    aggregator = MetricsAggregator()
+    d.add_hook(aggregator)
+    d.list_records(zone)
+    d.list_records(zone)
+    snapshot = aggregator.snapshot()
+
+    metrics = snapshot['endpoints']['GET /dns/managed/{id}/records']
+    assert_eq(metrics['network_time']['count'], 2)
+    assert_eq(metrics['decode_time']['count'], 2)
+    assert_eq(metrics['statuses'], {200: 2})
+    assert metrics['bytes']['min'] > 0, \
+        'The response size was not recorded'
+    assert_eq(snapshot['conversions']['record']['count'], 2)
+    assert snapshot['requests_remaining'] is not None, \
+        'The number of remaining requests was not recorded'
@@ -0,0 +1,109 @@
+from .. import *
+
+import asyncio
+import time
+
+from dnsmadeeasy.aio import AsyncDNSMadeEasyDNSDriver
+from dnsmadeeasy.driver import DNSMadeEasyDNSDriver, \
+    DNSMadeEasyRateLimitExceededError
+from dnsmadeeasy.ratelimit import RequestScheduler
+
+from ..stub import StubServer
+
+
+@test
+def RequestScheduler_acquire0():
+    """Tests that RequestScheduler.acquire consumes tokens"""
+    scheduler = RequestScheduler(10, 300)
+    for i in range(10):
+        assert scheduler.acquire(0), \
+            'Failed to acquire token %d' % i
+    assert not scheduler.acquire(0), \
+        'Acquired a token from an empty bucket'
+
+
+@test
+def RequestScheduler_acquire1():
+    """Tests that RequestScheduler.acquire waits for tokens to be refilled"""
+    scheduler = RequestScheduler(10, 1)
+    for i in range(10):
+        scheduler.acquire()
+
+    start = time.time()
+    scheduler.acquire()
+    assert time.time() - start >= 0.05, \
+        'RequestScheduler.acquire did not wait'
+
+
+@test
+def RequestScheduler_update():
+    """Tests that RequestScheduler.update lowers the number of tokens"""
+    scheduler = RequestScheduler(150, 300)
+    scheduler.update({
+        'x-dnsme-requestLimit': '100',
+        'x-dnsme-requestsRemaining': '3'})
+    assert_eq(
+        scheduler.request_limit,
+        100)
+    assert scheduler.tokens < 4, \
+        'The number of tokens was not lowered'
+
+
+@test
+def RequestScheduler_shared():
+    """Tests that RequestScheduler.shared returns the same instance for the
+    same API key"""
+    assert RequestScheduler.shared('key1') is RequestScheduler.shared('key1'), \
+        'Different schedulers were returned for the same key'
+    assert not RequestScheduler.shared('key1') \
+            is RequestScheduler.shared('key2'), \
+        'The same scheduler was returned for different keys'
+
+
+@test
+def DNSMadeEasyDNSDriver_rate_limited():
+    """Tests that DNSMadeEasyDNSDriver waits for the request limit window when
+    using a scheduler"""
+    with StubServer('key', 'secret', request_limit = 10, window = 1) as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url,
+            scheduler = RequestScheduler(1000, 1))
+        start = time.time()
+        for i in range(15):
+            d.list_zones()
+        assert time.time() - start >= 0.9, \
+            'The request limit window was not waited for'
+
+
+@test
+def DNSMadeEasyDNSDriver_rate_limited_timeout():
+    """Tests that DNSMadeEasyDNSDriver gives up on a request rejected because
+    of the request limit after rate_limit_timeout"""
+    with StubServer('key', 'secret', request_limit = 10, window = 30) \
+            as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url,
+            scheduler = RequestScheduler(1000, 1), rate_limit_timeout = 0.2)
+        start = time.time()
+        with assert_exception(DNSMadeEasyRateLimitExceededError,
+                lambda e: e.request_limit == 10):
+            for i in range(15):
+                d.list_zones()
+        assert time.time() - start < 5, \
+            'rate_limit_timeout was not respected'
+
+
+@test
+def AsyncDNSMadeEasyDNSDriver_rate_limited():
+    """Tests that AsyncDNSMadeEasyDNSDriver resends requests rejected because
+    of the request limit when using a scheduler"""
+    async def run(url):
+        async with AsyncDNSMadeEasyDNSDriver('key', 'secret',
+                entry_point = url,
+                scheduler = RequestScheduler(1000, 1)) as d:
+            for i in range(15):
+                await d.list_zones()
+
+    with StubServer('key', 'secret', request_limit = 10, window = 1) as server:
+        start = time.time()
+        asyncio.run(run(server.url))
+        assert time.time() - start >= 0.9, \
+            'The request limit window was not waited for'
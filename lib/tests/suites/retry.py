@@ -0,0 +1,241 @@
+from .. import *
+
+import requests
+import socket
+
+from libcloud.dns.types import RecordDoesNotExistError
+
+from dnsmadeeasy.driver import DNSMadeEasyDNSDriver, \
+    DNSMadeEasyRateLimitExceededError
+from dnsmadeeasy.retry import RetryPolicy
+
+from ..stub import StubServer
+
+
+def create_policy(**kwargs):
+    """Creates a retry policy without delays"""
+    return RetryPolicy(backoff = 0.0, jitter = False, **kwargs)
+
+
+@test
+def RetryPolicy_delay():
+    """Tests that RetryPolicy.delay increases exponentially"""
+    policy = RetryPolicy(max_retries = 4, backoff = 1.0, max_backoff = 5.0,
+        jitter = False)
+    assert_eq(
+        [policy.delay(attempt) for attempt in range(5)],
+        [1.0, 2.0, 4.0, 5.0, None])
+
+
+@test
+def RetryPolicy_delay_jitter():
+    """Tests that RetryPolicy.delay does not exceed the exponential delay
+    with jitter"""
+    policy = RetryPolicy(max_retries = 10, backoff = 1.0, max_backoff = 5.0)
+    assert all(
+        0.0 <= policy.delay(attempt) <= min(2 ** attempt, 5.0)
+        for attempt in range(10)), \
+        'A delay was out of range'
+
+
+@test
+def RetryPolicy_delay_rate_limited():
+    """Tests that RetryPolicy.delay waits for the request quota when rate
+    limited"""
+    r = requests.Response()
+    r.status_code = 400
+    r.headers.update({
+        'x-dnsme-requestLimit': '150',
+        'x-dnsme-requestsRemaining': '0'})
+    policy = RetryPolicy(max_retries = 10, max_backoff = 1.0, window = 300)
+    assert_eq(
+        [policy.delay(attempt, r) for attempt in range(10)],
+        [2.0, 4.0, 8.0, 16.0, 32.0, 64.0, 128.0, 256.0, 300.0, 300.0])
+
+    r.headers['Retry-After'] = '0.5'
+    assert_eq(policy.delay(0, r), 0.5)
+
+
+@test
+def DNSMadeEasyDNSDriver_retry_get():
+    """Tests that DNSMadeEasyDNSDriver resends failed GET requests"""
+    with StubServer('key', 'secret') as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url,
+            retry = create_policy())
+        server.fail(503, count = 2)
+        assert_eq(d.list_zones(), [])
+        assert_eq(d.retry_stats['retries'], 2)
+
+
+@test
+def DNSMadeEasyDNSDriver_retry_exhausted():
+    """Tests that DNSMadeEasyDNSDriver fails once all retries are used"""
+    with StubServer('key', 'secret') as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url,
+            retry = create_policy(max_retries = 2))
+        server.fail(500, count = 3)
+        with assert_exception(requests.HTTPError):
+            d.list_zones()
+        assert_eq(d.retry_stats['retries'], 2)
+
+
+@test
+def DNSMadeEasyDNSDriver_retry_connection():
+    """Tests that DNSMadeEasyDNSDriver resends requests that failed to
+    connect"""
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    url = 'http://%s:%d' % s.getsockname()
+    s.close()
+
+    d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = url,
+        retry = create_policy(max_retries = 2))
+    with assert_exception(requests.ConnectionError):
+        d.list_zones()
+    assert_eq(d.retry_stats['retries'], 2)
+
+
+@test
+def DNSMadeEasyDNSDriver_retry_post():
+    """Tests that DNSMadeEasyDNSDriver does not resend failed POST requests
+    that may have been applied"""
+    with StubServer('key', 'secret') as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url,
+            retry = create_policy())
+        server.fail(500)
+        with assert_exception(requests.HTTPError):
+            d.create_zone('example.com')
+        assert_eq(d.retry_stats['retries'], 0)
+
+
+@test
+def DNSMadeEasyDNSDriver_retry_create_record():
+    """Tests that DNSMadeEasyDNSDriver.create_record does not create a record
+    twice when an applied request fails"""
+    with StubServer('key', 'secret') as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url,
+            retry = create_policy())
+        zone = d.create_zone('example.com')
+
+        server.fail(500, applied = True)
+        record = d.create_record('subdomain', zone, 'A', '1.1.1.1')
+        assert_eq(
+            [r.id for r in d.list_records(zone)],
+            [record.id])
+
+        server.fail(500)
+        d.create_record('subdomain2', zone, 'A', '1.1.1.1')
+        assert_eq(
+            sorted(r.name for r in d.list_records(zone)),
+            ['subdomain', 'subdomain2'])
+        assert_eq(d.retry_stats['retries'], 2)
+
+
+@test
+def DNSMadeEasyDNSDriver_delete_record_failed():
+    """Tests that DNSMadeEasyDNSDriver.delete_record keeps the record indexed
+    when the request fails"""
+    with StubServer('key', 'secret') as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url,
+            index_ttl = 60)
+        zone = d.create_zone('example.com')
+        record = d.create_record('subdomain', zone, 'A', '1.1.1.1')
+        d.list_records(zone)
+
+        server.fail(500)
+        with assert_exception(requests.HTTPError):
+            d.delete_record(record)
+        assert_eq(
+            [r.id for r in d.find_records(zone, name = 'subdomain')],
+            [record.id])
+
+
+@test
+def DNSMadeEasyDNSDriver_delete_records_failed():
+    """Tests that DNSMadeEasyDNSDriver.delete_records keeps the records
+    indexed when the request fails"""
+    with StubServer('key', 'secret') as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url,
+            index_ttl = 60)
+        zone = d.create_zone('example.com')
+        records = d.create_records(zone, [
+            {'name': 'subdomain%d' % i, 'type': 'A', 'data': '1.1.1.1'}
+            for i in range(3)])
+        d.list_records(zone)
+
+        server.fail(500)
+        with assert_exception(requests.HTTPError):
+            d.delete_records(records)
+        assert_eq(
+            sorted(r.id for r in d.find_records(zone, type = 'A')),
+            sorted(r.id for r in records))
+
+
+@test
+def DNSMadeEasyDNSDriver_delete_zones_failed():
+    """Tests that DNSMadeEasyDNSDriver.delete_zone and
+    DNSMadeEasyDNSDriver.delete_zones keep the zone state when the request
+    fails"""
+    with StubServer('key', 'secret') as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url,
+            index_ttl = 60)
+        zone = d.create_zone('example.com')
+        d.list_records(zone)
+
+        for delete in (d.delete_zone, lambda zone: d.delete_zones([zone])):
+            server.fail(500)
+            with assert_exception(requests.HTTPError):
+                delete(zone)
+            assert d._get_index(zone.id) is not None, \
+                'The record index was removed'
+            requests_sent = server.requests
+            assert_eq(d.get_zone_by_domain(zone.domain).id, zone.id)
+            assert_eq(server.requests, requests_sent)
+
+
+@test
+def DNSMadeEasyDNSDriver_retry_create_record_rate_limited():
+    """Tests that DNSMadeEasyDNSDriver.create_record resends requests
+    rejected because of the request limit only once"""
+    with StubServer('key', 'secret', request_limit = 2) as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url,
+            retry = create_policy(max_retries = 1, window = 0.0))
+        zone = d.create_zone('example.com')
+        d.list_zones()
+
+        with assert_exception(DNSMadeEasyRateLimitExceededError,
+                lambda e: e.request_limit == 2):
+            d.create_record('subdomain', zone, 'A', '1.1.1.1')
+        assert_eq(d.retry_stats['retries'], 1)
+        assert_eq(server.requests, 4)
+
+
+@test
+def DNSMadeEasyDNSDriver_retry_delete_applied():
+    """Tests that DNSMadeEasyDNSDriver does not fail deletions that were
+    applied before a resent request failed"""
+    with StubServer('key', 'secret') as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url,
+            retry = create_policy(), index_ttl = 60)
+        zone = d.create_zone('example.com')
+        records = d.create_records(zone, [
+            {'name': 'subdomain%d' % i, 'type': 'A', 'data': '1.1.1.1'}
+            for i in range(3)])
+        d.list_records(zone)
+
+        server.fail(500, applied = True)
+        d.delete_record(records[0])
+        server.fail(500, applied = True)
+        d.delete_records(records[1:])
+        assert_eq(d.list_records(zone), [])
+        assert_eq(d.find_records(zone, name = 'subdomain1'), [])
+
+        server.fail(500, applied = True)
+        d.delete_zone(zone)
+        zones = d.create_zones(['example%d.com' % i for i in range(2)]).created
+        server.fail(500, applied = True)
+        d.delete_zones(zones)
+        assert_eq(d.retry_stats['retries'], 4)
+
+        with assert_exception(RecordDoesNotExistError):
+            d.delete_record(records[0])
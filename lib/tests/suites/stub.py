@@ -0,0 +1,39 @@
+from .. import *
+
+from dnsmadeeasy.api import DNSMadeEasyAPI
+from dnsmadeeasy.driver import DNSMadeEasyDNSDriver, \
+    DNSMadeEasyRateLimitExceededError
+
+from ..stub import StubServer
+
+
+@test
+def StubServer_authenticate():
+    """Tests that the stub server rejects invalid signatures"""
+    with StubServer('key', 'secret') as server:
+        r = DNSMadeEasyAPI('key', 'invalid',
+            entry_point = server.url).dns.managed.GET()
+        assert_eq(
+            r.status_code,
+            403)
+
+
+@test
+def StubServer_request_limit():
+    """Tests that the stub server enforces the request limit"""
+    with StubServer('key', 'secret', request_limit = 1) as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url)
+        d.list_zones()
+        with assert_exception(DNSMadeEasyRateLimitExceededError):
+            d.list_zones()
+
+
+@test
+def StubServer_pending_delay():
+    """Tests that the stub server keeps deleted zones pending"""
+    with StubServer('key', 'secret', pending_delay = 60) as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url)
+        d.delete_zone(d.create_zone('example.com'))
+        assert_eq(
+            [zone.extra['pendingActionId'] != 0 for zone in d.list_zones()],
+            [True])
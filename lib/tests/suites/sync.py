@@ -0,0 +1,68 @@
+from .. import *
+from . import STUB
+from .driver import create_driver
+
+from dnsmadeeasy.sync import ZoneStore
+
+
+def sync_domain_names():
+    """Yields a list of domain names unique for this session"""
+    i = 1
+    while True:
+        yield 'sync%02d.com' % i
+        i += 1
+
+sync_domain_names = sync_domain_names()
+
+
+@test
+def ZoneStore_sync0():
+    """Tests that ZoneStore.sync stores all records of new zones"""
+    d = create_driver()
+    zone = d.create_zone(next(sync_domain_names))
+    d.create_record('subdomain', zone, type = 'A', data = '1.1.1.1')
+
+    with ZoneStore(d) as store:
+        assert zone.id in store.sync().refreshed, \
+            'A new zone was not synchronised'
+
+        assert_eq(store.get_zone(zone.domain).id, zone.id)
+        assert_eq(
+            [(r.name, r.type, r.data, r.zone.id)
+                for r in store.find_records(name = 'subdomain')],
+            [('subdomain', 'A', '1.1.1.1', zone.id)])
+        assert_eq(
+            store.find_records(zone, type = 'A', data = '2.2.2.2'),
+            [])
+
+    d.delete_zone(zone)
+
+
+@test
+def ZoneStore_sync1():
+    """Tests that ZoneStore.sync lists the records of changed zones only"""
+    d = create_driver()
+    zone1 = d.create_zone(next(sync_domain_names))
+    zone2 = d.create_zone(next(sync_domain_names))
+
+    with ZoneStore(d) as store:
+        store.sync()
+        requests = STUB.requests if STUB else None
+        report = store.sync()
+        assert zone1.id in report.unchanged and zone2.id in report.unchanged, \
+            'Unchanged zones were synchronised'
+        if STUB:
+            assert_eq(STUB.requests - requests, 1)
+
+        d.create_record('subdomain', zone1, type = 'A', data = '1.1.1.1')
+        report = store.sync()
+        assert zone1.id in report.refreshed, \
+            'A changed zone was not synchronised'
+        assert zone2.id in report.unchanged, \
+            'An unchanged zone was synchronised'
+        assert_eq(
+            [r.name for r in store.find_records(zone1, type = 'A')],
+            ['subdomain'])
+
+    d.delete_zone(zone1)
+    d.delete_zone(zone2)
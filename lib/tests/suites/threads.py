@@ -0,0 +1,106 @@
+from .. import *
+
+import sys
+import threading
+import time
+
+from dnsmadeeasy.driver import DNSMadeEasyDNSDriver
+from dnsmadeeasy.index import RecordIndex
+
+from ..stub import StubServer
+
+
+def run_workers(d, zone, thread_count, operations):
+    """Runs a mix of operations on a zone from several threads.
+
+    @param d
+        The driver shared by all threads.
+    @param zone
+        The zone in which to create records.
+    @param thread_count
+        The number of threads.
+    @param operations
+        The number of create, get, list and delete sequences per thread.
+    @return the tuple (duration, errors)
+    """
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(operations):
+                record = d.create_record('thread%d-%d' % (n, i), zone, 'A',
+                    '1.1.1.1')
+                assert_eq(d.get_record(zone, record.id).name, record.name)
+                assert any(r.id == record.id for r in d.list_records(zone)), \
+                    'A created record was not listed'
+                d.delete_record(record)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target = worker, args = (n,))
+        for n in range(thread_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, errors
+
+
+@test
+def DNSMadeEasyDNSDriver_threads():
+    """Tests that DNSMadeEasyDNSDriver can be shared between threads and that
+    throughput scales with the number of threads"""
+    thread_count = 8
+    operations = 5
+    with StubServer('key', 'secret', latency = 0.01,
+            request_limit = 1000000) as server:
+        d = DNSMadeEasyDNSDriver('key', 'secret', entry_point = server.url,
+            pool_maxsize = thread_count, cache = True)
+        zone = d.create_zone('example.com')
+
+        single, errors = run_workers(d, zone, 1, operations)
+        assert_eq(errors, [])
+
+        connections = server.connections
+        multiple, errors = run_workers(d, zone, thread_count, operations)
+        assert_eq(errors, [])
+        assert_eq(d.list_records(zone), [])
+        assert server.connections - connections <= thread_count, \
+            'Connections were not reused'
+
+        # The server latency dominates, so the throughput should grow with the
+        # number of threads; the client and the stub server share one
+        # interpreter, so the bound is kept loose
+        speedup = thread_count * single / multiple
+        assert speedup > thread_count / 4.0, \
+            'Throughput increased only %.1f times with %d threads' % (
+                speedup, thread_count)
+
+
+@test
+def RecordIndex_find_concurrent_add():
+    """Tests that records added to a RecordIndex while its lookups are being
+    built can be found"""
+    def item(i):
+        return {'id': i, 'name': 'host%d' % i, 'type': 'A', 'value': '1.1.1.1'}
+
+    # Switch threads often to make the race likely
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for attempt in range(20):
+            index = RecordIndex(None, [item(i) for i in range(5000)])
+            added = [item(i) for i in range(5000, 5200)]
+            thread = threading.Thread(
+                target = lambda: [index.add(a) for a in added])
+            thread.start()
+            index.find(name = 'host0')
+            thread.join()
+
+            for a in added:
+                assert_eq(index.find(name = a['name']), [a])
+
+    finally:
+        sys.setswitchinterval(interval)
@@ -0,0 +1,134 @@
+from .. import *
+from . import STUB
+from .driver import create_driver, domain_names
+
+import io
+
+from dnsmadeeasy.zonefile import ZoneFileError, parse_ttl, quote, read, \
+    unquote
+
+
+@test
+def parse_ttl_units():
+    """Tests that parse_ttl handles units"""
+    assert_eq(
+        [parse_ttl(value) for value in ('300', '1h30m', '2D', 'IN')],
+        [300, 5400, 172800, None])
+
+
+@test
+def unquote_escapes():
+    """Tests that unquote reverses quote and replaces escape sequences"""
+    for text in (u'hello world', u'say "hi"', u'back\\slash', u''):
+        assert_eq(unquote(quote(text)), text)
+    assert_eq(unquote(u'a\\059b'), u'a;b')
+    assert_eq(unquote(u'plain'), u'plain')
+
+
+@test
+def read_directives():
+    """Tests that read handles directives, inherited owners and continued
+    lines"""
+    entries = list(read(io.StringIO(
+        u'$TTL 1h\n'
+        u'@ IN SOA ns1.example.com. admin.example.com. (\n'
+        u'    1 ; serial\n'
+        u'    7200 3600 1209600 300 )\n'
+        u'www 60 IN A 10.0.0.1\n'
+        u'    IN TXT "a; b" "c"\n'
+        u'$ORIGIN sub.example.com.\n'
+        u'host A 10.0.0.2\n'), 'example.com'))
+
+    assert_eq(
+        [(entry.name, entry.ttl, entry.type, entry.rdata, entry.origin)
+            for entry in entries],
+        [
+            ('', 3600, 'SOA', ['ns1.example.com.', 'admin.example.com.',
+                '1', '7200', '3600', '1209600', '300'], 'example.com'),
+            ('www', 60, 'A', ['10.0.0.1'], 'example.com'),
+            ('www', 3600, 'TXT', ['"a; b"', '"c"'], 'example.com'),
+            ('host.sub', 3600, 'A', ['10.0.0.2'], 'sub.example.com')])
+
+
+@test
+def read_invalid():
+    """Tests that read reports the line of invalid entries"""
+    for text, line in (
+            (u'www A 10.0.0.1\nother.org. A 10.0.0.2\n', 2),
+            (u'www A 10.0.0.1\n$INCLUDE other\n', 2),
+            (u'www TXT "unterminated\n', 1),
+            (u'www A (\n10.0.0.1\n', 1)):
+        with assert_exception(ZoneFileError,
+                lambda e: e.line == line):
+            list(read(io.StringIO(text), 'example.com'))
+
+
+@test
+def DNSMadeEasyDNSDriver_export_import_zone():
+    """Tests that records exported by DNSMadeEasyDNSDriver.export_zone are
+    recreated by DNSMadeEasyDNSDriver.import_zone"""
+    d = create_driver()
+    source = d.create_zone(next(domain_names))
+    d.create_records(source, [
+        {'name': '', 'type': 'A', 'data': '10.0.0.1'},
+        {'name': 'www', 'type': 'CNAME', 'data': 'web', 'extra': {'ttl': 60}},
+        {'name': '', 'type': 'MX', 'data': 'mail', 'extra': {'mxLevel': 10}},
+        {'name': '_sip._tcp', 'type': 'SRV', 'data': 'sip',
+            'extra': {'priority': 1, 'weight': 2, 'port': 5060}},
+        {'name': 'text', 'type': 'TXT', 'data': '"hello; world"'},
+        {'name': 'text', 'type': 'TXT', 'data': 'hello world'},
+        {'name': 'text', 'type': 'TXT', 'data': 'say "hi" \\o/'},
+        {'name': 'spf', 'type': 'SPF', 'data': 'v=spf1 -all'},
+        {'name': 'alias', 'type': 'ANAME', 'data': 'example.org.'},
+        {'name': 'go', 'type': 'HTTPRED', 'data': 'http://example.org/'}])
+
+    exported = io.StringIO()
+    assert_eq(d.export_zone(source, exported), 10)
+
+    # Import into another zone, relying on the initial origin
+    lines = exported.getvalue().splitlines(True)
+    assert_eq(lines[0], '$ORIGIN %s.\n' % source.domain)
+    target = d.create_zone(next(domain_names))
+    assert_eq(d.import_zone(target, io.StringIO(u''.join(lines[1:]))), 10)
+
+    def values(zone):
+        return sorted(
+            repr((record.name, record.type, record.data) + tuple(
+                record.extra.get(name)
+                for name in ('ttl', 'mxLevel', 'priority', 'weight', 'port')))
+            for record in d.list_records(zone))
+    assert_eq(values(target), values(source))
+
+
+@test
+def DNSMadeEasyDNSDriver_import_zone_types():
+    """Tests that DNSMadeEasyDNSDriver.import_zone maps record types and
+    creates records in chunks"""
+    d = create_driver()
+    zone = d.create_zone(next(domain_names))
+    text = u''.join(
+        u'host%d 300 IN A 10.0.0.%d\n' % (i, i % 256)
+        for i in range(d.BATCH_SIZE + 1))
+    text += (
+        u'@ IN SOA ns1 admin 1 2 3 4 5\n'
+        u'text TXT "v=spf1 " "-all"\n'
+        u'go REDIRECT http://example.org/\n'
+        u'$ORIGIN sub.%s.\n'
+        u'mail MX 5 mx\n' % zone.domain)
+
+    requests = STUB.requests if STUB else None
+    assert_eq(d.import_zone(zone, io.StringIO(text)), d.BATCH_SIZE + 4)
+    if STUB:
+        assert_eq(STUB.requests - requests, 2)
+
+    records = d.find_records(zone, name = 'text')
+    assert_eq([record.data for record in records], ['v=spf1 -all'])
+    records = d.find_records(zone, name = 'go')
+    assert_eq([record.type for record in records], ['HTTPRED'])
+    records = d.find_records(zone, name = 'mail.sub')
+    assert_eq(
+        [(record.data, record.extra['mxLevel']) for record in records],
+        [('mx.sub.%s.' % zone.domain, 5)])
+
+    with assert_exception(ZoneFileError):
+        d.import_zone(zone, io.StringIO(u'www LOC 1 2 3\n'))
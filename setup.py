@@ -17,6 +17,9 @@ INSTALL_REQUIRES = [
     'hammock >=0.2.4',
     'apache-libcloud >=0.14.1']
 SETUP_REQUIRES = INSTALL_REQUIRES
+EXTRAS_REQUIRE = {
+    'async': [
+        'aiohttp >=3.0']}
 
 
 BASE_DIR = os.path.dirname(__file__)
@@ -71,6 +74,40 @@ class test_runner(test):
         sys.exit(len(failures))
 
 
+class benchmark_runner(setuptools.Command):
+    user_options = [
+        ('sizes=', 's', 'A list of zone sizes separated by comma (,)'),
+        ('repeat=', 'r', 'The number of times to repeat every benchmark'),
+        ('latency=', 'l', 'The latency of the stub server, in seconds'),
+        ('output=', 'o', 'The file to which to write the results as JSON'),
+        ('compare=', 'c', 'A results file of a previous run to compare with')]
+
+    def initialize_options(self):
+        self.sizes = None
+        self.repeat = None
+        self.latency = None
+        self.output = None
+        self.compare = None
+
+    def finalize_options(self):
+        if not self.sizes is None:
+            self.sizes = [int(size) for size in self.sizes.split(',')]
+        if not self.repeat is None:
+            self.repeat = int(self.repeat)
+        if not self.latency is None:
+            self.latency = float(self.latency)
+
+    def run(self):
+        import tests.benchmark
+
+        tests.benchmark.run(
+            sizes = self.sizes or tests.benchmark.DEFAULT_SIZES,
+            repeat = self.repeat or tests.benchmark.DEFAULT_REPEAT,
+            output = self.output,
+            previous = self.compare,
+            latency = self.latency or 0.0)
+
+
 setuptools.setup(
     name = NAME,
     description = DESCRIPTION,
@@ -88,8 +125,11 @@ setuptools.setup(
     scripts = SCRIPTS,
 
     install_requires = INSTALL_REQUIRES,
+    extras_require = EXTRAS_REQUIRE,
     setup_requires = SETUP_REQUIRES,
 
     zip_safe = True,
 
-    cmdclass = {'test': test_runner})
+    cmdclass = {
+        'benchmark': benchmark_runner,
+        'test': test_runner})